@@ -1,31 +1,219 @@
 from __future__ import annotations
 
+import argparse
 import base64
+import hashlib
+import json
 import os
 import posixpath
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from io import StringIO
+from itertools import takewhile
 from pathlib import Path
-from typing import List, Optional, Tuple
-from urllib.parse import urlparse
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urljoin
 
 import requests
 from packaging.version import InvalidVersion, Version
+from requests.adapters import HTTPAdapter
 from ruamel.yaml import YAML
+from urllib3.util.retry import Retry
 
 SEMVER_RE = re.compile(r"^v?\d+\.\d+\.\d+([\-+].+)?$")
 GITHUB_REPO_RE = re.compile(r"^https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$")
+CONCURRENCY = max(1, int(os.getenv("AUTO_UPDATE_CONCURRENCY", "8")))
+CACHE_DIR = Path(os.getenv("AUTO_UPDATE_CACHE_DIR", ".cache/auto-update"))
+CACHE_MAX_AGE_SECONDS = float(os.getenv("AUTO_UPDATE_CACHE_MAX_AGE_DAYS", "7")) * 86400
+CACHED_HEADERS = ("Content-Type", "Link")
+DOCKER_HUB_HOSTS = ("docker.io", "index.docker.io", "registry-1.docker.io")
+TAG_STATE_DIR = CACHE_DIR / "tags"
+MANIFEST_DIR = CACHE_DIR / "manifests"
+MANIFEST_CANDIDATES = 3
+MANIFEST_ACCEPT = ", ".join(
+    [
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    ]
+)
+# Home Assistant architecture names and the image platforms that serve them.
+HA_ARCH_PLATFORMS = {"amd64": "amd64", "aarch64": "arm64", "armv7": "arm/v7", "armhf": "arm/v6", "i386": "386"}
+TAG_RESYNC_SECONDS = float(os.getenv("AUTO_UPDATE_TAG_RESYNC_HOURS", "24")) * 3600
+# Semver tags start with a digit or "v<digit>". In lexical order all digit tags
+# come first, and "v/" sorts just before "v0", so these two ranges hold every
+# candidate and skip the "latest", "sha-…" and CI tags in between.
+VERSION_TAG_RANGES: Tuple[Tuple[Optional[str], Callable[[str], bool]], ...] = (
+    (None, lambda tag: tag[:1].isdigit()),
+    ("v/", lambda tag: tag[:1] == "v" and tag[1:2].isdigit()),
+)
+GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH_SIZE = 10
+README_PATHS = ["README.md", "Readme.md", "readme.md", "docs/README.md", "docs/readme.md"]
+CHANGELOG_PATHS = [
+    "CHANGELOG.md",
+    "Changelog.md",
+    "changelog.md",
+    "docs/CHANGELOG.md",
+    "docs/Changelog.md",
+    "docs/changelog.md",
+    "CHANGELOG",
+    "Changelog",
+    "changelog",
+]
+
+_output = threading.local()
+_cache_stats = {"not_modified": 0, "fetched": 0}
+_cache_lock = threading.Lock()
+_token_cache: dict = {}
+_registry_challenges: dict = {}
+_token_lock = threading.Lock()
+_github_prefetch: dict = {}
+_request_count = {"n": 0}
+_manifest_pool = ThreadPoolExecutor(max_workers=CONCURRENCY)
+
+
+def build_session() -> requests.Session:
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=CONCURRENCY * 2, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(count_response)
+    return session
+
+
+def count_response(r: requests.Response, *args, **kwargs) -> None:
+    counter = getattr(_output, "counter", None)
+    with _cache_lock:
+        _request_count["n"] += 1
+        if counter is not None:
+            counter["requests"] += 1
+
+
+http = build_session()
+
+
+def log(line: str) -> None:
+    lines = getattr(_output, "lines", None)
+    if lines is None:
+        print(line)
+    else:
+        lines.append(line)
+
+
+def cache_path(url: str) -> Path:
+    return CACHE_DIR / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+
+def read_cache_file(path: Path):
+    # Reading an entry marks it as used, so prune_cache() keeps it.
+    try:
+        data = json.loads(path.read_text())
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return data
+
+
+def prune_cache() -> int:
+    # Entries for old blobs, manifests and tag pages are never requested again;
+    # drop whatever has not been used for CACHE_MAX_AGE_SECONDS.
+    cutoff = time.time() - CACHE_MAX_AGE_SECONDS
+    removed = 0
+    for path in CACHE_DIR.rglob("*"):
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def load_cache_entry(url: str) -> Optional[dict]:
+    entry = read_cache_file(cache_path(url))
+    if entry is None:
+        return None
+    return entry if entry.get("url") == url else None
+
+
+def store_cache_entry(url: str, r: requests.Response) -> None:
+    entry = {
+        "url": url,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "headers": {k: r.headers[k] for k in CACHED_HEADERS if k in r.headers},
+        "body": r.text,
+    }
+    path = cache_path(url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(entry))
+    os.replace(tmp, path)
+
+
+def cached_response(r: requests.Response, entry: dict) -> requests.Response:
+    cached = requests.Response()
+    cached.status_code = 200
+    cached._content = entry["body"].encode("utf-8")
+    cached.encoding = "utf-8"
+    cached.headers.update(entry.get("headers") or {})
+    cached.url = r.url
+    cached.request = r.request
+    return cached
+
+
+def cached_get(url: str, *, headers=None, params=None, timeout: float = 20) -> requests.Response:
+    full_url = requests.Request("GET", url, params=params).prepare().url
+    entry = load_cache_entry(full_url)
+    headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    r = http.get(full_url, headers=headers, timeout=timeout)
+    if r.status_code == 304 and entry:
+        with _cache_lock:
+            _cache_stats["not_modified"] += 1
+        return cached_response(r, entry)
+
+    with _cache_lock:
+        _cache_stats["fetched"] += 1
+    if r.status_code == 200 and (r.headers.get("ETag") or r.headers.get("Last-Modified")):
+        try:
+            store_cache_entry(full_url, r)
+        except OSError as e:
+            log(f"CACHE  ERROR {full_url}: {e}")
+    return r
 
 
 def parse_image(image: str) -> Tuple[str, str]:
-    image = image.strip()
-    if "@" in image:
-        image = image.split("@", 1)[0]
-    if ":" in image and image.count(":") == 1 and "/" in image.split(":")[0]:
+    image = image.strip().split("@", 1)[0]
+    if ":" in image.rsplit("/", 1)[-1]:
         image = image.rsplit(":", 1)[0]
     parts = image.split("/")
-    if "." in parts[0]:
-        return parts[0], "/".join(parts[1:])
-    return "ghcr.io", image
+    if len(parts) > 1 and ("." in parts[0] or ":" in parts[0] or parts[0] == "localhost"):
+        registry, repository = parts[0], "/".join(parts[1:])
+    else:
+        registry, repository = "docker.io", image
+    if registry in DOCKER_HUB_HOSTS:
+        registry = "docker.io"
+        if "/" not in repository:
+            repository = f"library/{repository}"
+    return registry, repository
 
 
 def parse_www_authenticate(header: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
@@ -40,88 +228,292 @@ def parse_www_authenticate(header: str) -> Tuple[Optional[str], Optional[str], O
     return realm, service, scope
 
 
-def get_bearer_token(www_auth: str) -> Optional[str]:
+def get_bearer_token(www_auth: str, auth: Optional[Tuple[str, str]] = None) -> Optional[str]:
     realm, service, scope = parse_www_authenticate(www_auth)
     if not realm:
         return None
 
+    key = (realm, service, scope)
+    with _token_lock:
+        cached = _token_cache.get(key)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
     params = {}
     if service:
         params["service"] = service
     if scope:
         params["scope"] = scope
 
-    username = os.getenv("GHCR_USERNAME") or os.getenv("GITHUB_USERNAME")
-    token = os.getenv("GHCR_TOKEN") or os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN")
-    auth = (username, token) if username and token else None
-
-    r = requests.get(realm, params=params, auth=auth, timeout=20)
+    requested = time.monotonic()
+    r = http.get(realm, params=params, auth=auth, timeout=20)
     if r.status_code != 200:
         return None
 
     data = r.json()
-    return data.get("token") or data.get("access_token")
+    bearer = data.get("token") or data.get("access_token")
+    if bearer:
+        # Tokens without expires_in are valid for 60 seconds; renew a little early.
+        expires_in = int(data.get("expires_in") or 60)
+        with _token_lock:
+            _token_cache[key] = (bearer, requested + max(0, expires_in - 10))
+    return bearer
 
 
-def list_ghcr_tags(repository: str) -> List[str]:
-    base_url = f"https://ghcr.io/v2/{repository}/tags/list"
+def newest_semvers(tags: List[str]) -> List[str]:
+    versions: List[Tuple[Version, str]] = []
+    for tag in tags:
+        if tag == "latest" or not SEMVER_RE.match(tag):
+            continue
+        try:
+            versions.append((Version(tag.lstrip("v")), tag))
+        except InvalidVersion:
+            pass
+    versions.sort(key=lambda x: x[0], reverse=True)
+    return [tag for _, tag in versions]
+
+
+def latest_semver(tags: List[str]) -> Optional[str]:
+    versions = newest_semvers(tags)
+    return versions[0] if versions else None
+
+
+def platform_name(platform: dict) -> str:
+    arch = platform.get("architecture") or ""
+    variant = platform.get("variant")
+    # 32-bit ARM images without a variant are built for ARMv7.
+    return f"arm/{variant or 'v7'}" if arch == "arm" else arch
+
+
+def load_manifest_platforms(digest: str) -> Optional[List[str]]:
+    platforms = read_cache_file(MANIFEST_DIR / f"{digest.replace(':', '-')}.json")
+    if platforms is None:
+        return None
+    return ["arm/v7" if platform == "arm" else platform for platform in platforms]
+
+
+def store_manifest_platforms(digest: str, platforms: List[str]) -> None:
+    MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+    path = MANIFEST_DIR / f"{digest.replace(':', '-')}.json"
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(platforms))
+    os.replace(tmp, path)
+
 
-    def do_get(url: str, *, headers=None, params=None):
-        return requests.get(url, headers=headers, params=params, timeout=20)
+def tag_state_path(image: str) -> Path:
+    return TAG_STATE_DIR / f"{hashlib.sha256(image.encode()).hexdigest()}.json"
 
-    r = do_get(base_url, params={"n": 1000})
-    headers = {}
 
-    if r.status_code == 401:
-        bearer = get_bearer_token(r.headers.get("WWW-Authenticate", ""))
-        if not bearer:
+def load_tag_state(image: str) -> Optional[dict]:
+    state = read_cache_file(tag_state_path(image))
+    if state is None:
+        return None
+    return state if state.get("image") == image else None
+
+
+def store_tag_state(image: str, state: dict) -> None:
+    path = tag_state_path(image)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+class RegistryClient:
+    page_size = 1000
+    credential_env: Tuple[Tuple[str, ...], Tuple[str, ...]] = ((), ())
+
+    def __init__(self, registry: str, api_host: Optional[str] = None) -> None:
+        self.registry = registry
+        self.api_host = api_host or registry
+
+    def credentials(self) -> Optional[Tuple[str, str]]:
+        usernames, tokens = self.credential_env
+        username = next((os.getenv(k) for k in usernames if os.getenv(k)), None)
+        token = next((os.getenv(k) for k in tokens if os.getenv(k)), None)
+        return (username, token) if username and token else None
+
+    def auth_headers(self, repository: str) -> dict:
+        challenge = _registry_challenges.get((self.registry, repository))
+        if not challenge:
+            return {}
+        bearer = get_bearer_token(challenge, self.credentials())
+        return {"Authorization": f"Bearer {bearer}"} if bearer else {}
+
+    def send(self, method: str, url: str, repository: str, params=None, headers=None) -> requests.Response:
+        headers = {**(headers or {}), **self.auth_headers(repository)}
+        if method == "GET":
+            return cached_get(url, headers=headers, params=params)
+        return http.request(method, url, headers=headers, params=params, timeout=20)
+
+    def request(self, method: str, url: str, repository: str, params=None, headers=None) -> requests.Response:
+        r = self.send(method, url, repository, params, headers)
+        if r.status_code != 401:
+            return r
+
+        challenge = r.headers.get("WWW-Authenticate", "")
+        _registry_challenges[(self.registry, repository)] = challenge
+        if not get_bearer_token(challenge, self.credentials()):
+            env = " and ".join(names[0] for names in self.credential_env if names)
             raise RuntimeError(
-                f"Authentication required for {repository}. "
-                f"Set GHCR_USERNAME and GHCR_TOKEN for private repos."
+                f"Authentication required for {self.registry}/{repository}."
+                + (f" Set {env} for private repos." if env else "")
             )
-        headers = {"Authorization": f"Bearer {bearer}"}
-        r = do_get(base_url, headers=headers, params={"n": 1000})
-
-    if r.status_code != 200:
-        raise RuntimeError(f"Failed to list tags for {repository}: {r.text[:200]}")
+        return self.send(method, url, repository, params, headers)
 
-    tags: List[str] = []
-    while True:
-        payload = r.json() or {}
-        tags.extend(payload.get("tags") or [])
+    def get(self, url: str, repository: str, params=None) -> requests.Response:
+        return self.request("GET", url, repository, params)
 
-        link = r.headers.get("Link", "")
-        m = re.search(r'<([^>]+)>;\s*rel="next"', link)
-        if not m:
-            break
+    def list_tags(
+        self, repository: str, last: Optional[str] = None, within: Optional[Callable[[str], bool]] = None
+    ) -> List[str]:
+        url = f"https://{self.api_host}/v2/{repository}/tags/list"
+        r = self.get(url, repository, params={"n": self.page_size, **({"last": last} if last else {})})
+        if r.status_code != 200:
+            raise RuntimeError(f"Failed to list tags for {self.registry}/{repository}: {r.text[:200]}")
+
+        tags: List[str] = []
+        seen = {r.url}
+        while True:
+            payload = r.json() or {}
+            page = payload.get("tags") or []
+            if within is not None:
+                # Tags arrive in lexical order, so the first one outside the range ends it.
+                inside = list(takewhile(within, page))
+                tags.extend(inside)
+                if len(inside) < len(page):
+                    break
+            else:
+                tags.extend(page)
+
+            link = r.headers.get("Link", "")
+            m = re.search(r'<([^>]+)>;\s*rel="next"', link)
+            if not m:
+                break
+
+            # Registries usually send a path relative to the registry host.
+            next_url = urljoin(r.url, m.group(1))
+            if next_url in seen:
+                raise RuntimeError(f"Pagination loops for {self.registry}/{repository} at {next_url}")
+            seen.add(next_url)
+            r = self.get(next_url, repository)
+            if r.status_code != 200:
+                raise RuntimeError(f"Pagination failed for {self.registry}/{repository}: {r.text[:200]}")
+
+        return list(dict.fromkeys(tags))
+
+    def version_tags(self, repository: str) -> List[str]:
+        return [tag for last, within in VERSION_TAG_RANGES for tag in self.list_tags(repository, last, within)]
+
+    def semver_candidates(self, repository: str) -> List[str]:
+        # A full listing is only needed without recent state. It also checks that
+        # the registry really returns tags in lexical order and honours last=, by
+        # comparing the range listing with it. Otherwise only the version ranges
+        # are paged through, starting from last=.
+        image = f"{self.registry}/{repository}"
+        state = load_tag_state(image)
+        now = time.time()
+        recent = bool(state) and now - state.get("synced_at", 0) < TAG_RESYNC_SECONDS
+        if recent and state.get("lexical"):
+            tags = self.version_tags(repository)
+            candidates = newest_semvers(tags)[:MANIFEST_CANDIDATES]
+            if candidates or not state.get("candidates"):
+                state.update({"candidates": candidates, "version_tags": len(tags), "checked_at": now})
+            else:
+                # Version tags do not vanish; the range listing no longer works.
+                log(f"TAGS   {image}: version ranges came back empty, listing every tag")
+                state = None
+        elif recent:
+            # Ranges were found not to work at the last sync; list every tag
+            # until the next one checks again.
+            tags = self.list_tags(repository)
+            state.update({"candidates": newest_semvers(tags)[:MANIFEST_CANDIDATES], "tags": len(tags), "checked_at": now})
+        else:
+            state = None
+
+        if state is None:
+            tags = self.list_tags(repository)
+            lexical = tags == sorted(tags)
+            if lexical:
+                expected = [tag for tag in tags if any(within(tag) for _, within in VERSION_TAG_RANGES)]
+                lexical = self.version_tags(repository) == expected
+                if not lexical:
+                    log(f"TAGS   {image}: registry does not page from last=, listing every tag")
+            state = {
+                "image": image,
+                "candidates": newest_semvers(tags)[:MANIFEST_CANDIDATES],
+                "lexical": lexical,
+                "tags": len(tags),
+                "synced_at": now,
+                "checked_at": now,
+            }
 
-        next_url = m.group(1)
-        r = do_get(next_url, headers=headers)
+        try:
+            store_tag_state(image, state)
+        except OSError as e:
+            log(f"CACHE  ERROR {image} tags: {e}")
+        return state["candidates"]
+
+    def manifest_platforms(self, repository: str, reference: str) -> Optional[List[str]]:
+        url = f"https://{self.api_host}/v2/{repository}/manifests/{reference}"
+        r = self.request("HEAD", url, repository, headers={"Accept": MANIFEST_ACCEPT})
+        digest = r.headers.get("Docker-Content-Digest")
+        if r.status_code != 200 or not digest:
+            return None
+
+        # Manifests are immutable, so a digest seen before needs no download.
+        platforms = load_manifest_platforms(digest)
+        if platforms is not None:
+            return platforms
+
+        url = f"https://{self.api_host}/v2/{repository}/manifests/{digest}"
+        r = self.request("GET", url, repository, headers={"Accept": MANIFEST_ACCEPT})
         if r.status_code != 200:
-            raise RuntimeError(f"Pagination failed for {repository}: {r.text[:200]}")
+            return None
+        manifest = r.json() or {}
+        if "manifests" in manifest:
+            platforms = sorted({platform_name(m.get("platform") or {}) for m in manifest["manifests"]} - {"", "unknown"})
+        else:
+            config_digest = (manifest.get("config") or {}).get("digest")
+            if not config_digest:
+                return None
+            rc = self.get(f"https://{self.api_host}/v2/{repository}/blobs/{config_digest}", repository)
+            if rc.status_code != 200:
+                return None
+            platforms = [platform_name(rc.json() or {})]
 
-    seen = set()
-    out = []
-    for t in tags:
-        if t not in seen:
-            seen.add(t)
-            out.append(t)
-    return out
+        try:
+            store_manifest_platforms(digest, platforms)
+        except OSError as e:
+            log(f"CACHE  ERROR {digest}: {e}")
+        return platforms
 
 
-def latest_semver(tags: List[str]) -> Optional[str]:
-    versions: List[Tuple[Version, str]] = []
-    for tag in tags:
-        if tag == "latest" or not SEMVER_RE.match(tag):
-            continue
-        try:
-            versions.append((Version(tag.lstrip("v")), tag))
-        except InvalidVersion:
-            pass
-    if not versions:
-        return None
-    versions.sort(key=lambda x: x[0])
-    return versions[-1][1]
+class GhcrClient(RegistryClient):
+    credential_env = (("GHCR_USERNAME", "GITHUB_USERNAME"), ("GHCR_TOKEN", "GITHUB_TOKEN", "GH_TOKEN"))
+
+
+class DockerHubClient(RegistryClient):
+    credential_env = (("DOCKERHUB_USERNAME",), ("DOCKERHUB_TOKEN",))
+
+    def __init__(self, registry: str) -> None:
+        super().__init__(registry, "registry-1.docker.io")
+
+
+class QuayClient(RegistryClient):
+    page_size = 100
+    credential_env = (("QUAY_USERNAME",), ("QUAY_TOKEN",))
+
+
+REGISTRY_CLIENTS = {"ghcr.io": GhcrClient, "docker.io": DockerHubClient, "quay.io": QuayClient}
+_registry_clients: dict = {}
+
+
+def registry_client(registry: str) -> RegistryClient:
+    with _token_lock:
+        if registry not in _registry_clients:
+            _registry_clients[registry] = REGISTRY_CLIENTS.get(registry, RegistryClient)(registry)
+        return _registry_clients[registry]
 
 
 def github_repo_full_from_url(url: str) -> Optional[str]:
@@ -142,7 +534,7 @@ def github_headers() -> dict:
 
 def github_default_branch(repo_full: str) -> Optional[str]:
     url = f"https://api.github.com/repos/{repo_full}"
-    r = requests.get(url, headers=github_headers(), timeout=20)
+    r = cached_get(url, headers=github_headers())
     if r.status_code != 200:
         return None
     return (r.json() or {}).get("default_branch")
@@ -150,14 +542,14 @@ def github_default_branch(repo_full: str) -> Optional[str]:
 
 def github_fetch_file(repo_full: str, path_in_repo: str, ref: str) -> Optional[str]:
     url = f"https://api.github.com/repos/{repo_full}/contents/{path_in_repo}"
-    r = requests.get(url, headers=github_headers(), params={"ref": ref}, timeout=20)
+    r = cached_get(url, headers=github_headers(), params={"ref": ref})
     if r.status_code != 200:
         return None
 
     data = r.json() or {}
     dl = data.get("download_url")
     if dl:
-        rr = requests.get(dl, headers=github_headers(), timeout=20)
+        rr = cached_get(dl, headers=github_headers())
         if rr.status_code == 200:
             return rr.text
         return None
@@ -170,7 +562,40 @@ def github_fetch_file(repo_full: str, path_in_repo: str, ref: str) -> Optional[s
     return None
 
 
-def github_fetch_first_existing(repo_full: str, paths: List[str], ref: str) -> Optional[Tuple[str, str]]:
+def github_tree(repo_full: str, ref: str) -> Optional[Tuple[dict, bool]]:
+    url = f"https://api.github.com/repos/{repo_full}/git/trees/{ref}"
+    r = cached_get(url, headers=github_headers(), params={"recursive": "1"})
+    if r.status_code != 200:
+        return None
+    data = r.json() or {}
+    blobs = {item["path"]: item["sha"] for item in data.get("tree") or [] if item.get("type") == "blob"}
+    return blobs, bool(data.get("truncated"))
+
+
+def github_fetch_blob(repo_full: str, sha: str) -> Optional[str]:
+    url = f"https://api.github.com/repos/{repo_full}/git/blobs/{sha}"
+    headers = {**github_headers(), "Accept": "application/vnd.github.raw+json"}
+    r = cached_get(url, headers=headers)
+    if r.status_code != 200:
+        return None
+    return r.content.decode("utf-8", errors="replace")
+
+
+def github_fetch_first_existing(
+    repo_full: str, paths: List[str], ref: str, tree: Optional[Tuple[dict, bool]] = None
+) -> Optional[Tuple[str, str]]:
+    # One tree listing tells us which candidate exists; probing each path is
+    # only needed when the tree is unavailable or too large to be complete.
+    if tree is not None:
+        blobs, truncated = tree
+        for p in paths:
+            if p in blobs:
+                txt = github_fetch_blob(repo_full, blobs[p])
+                if txt is not None:
+                    return p, txt
+        if not truncated:
+            return None
+
     for p in paths:
         txt = github_fetch_file(repo_full, p, ref)
         if txt is not None:
@@ -182,7 +607,7 @@ def github_get_release_body(repo_full: str, version: str) -> Optional[Tuple[str,
     headers = github_headers()
     for tag in (f"v{version}", version):
         url = f"https://api.github.com/repos/{repo_full}/releases/tags/{tag}"
-        r = requests.get(url, headers=headers, timeout=20)
+        r = cached_get(url, headers=headers)
         if r.status_code == 200:
             data = r.json() or {}
             body = (data.get("body") or "").strip()
@@ -192,84 +617,177 @@ def github_get_release_body(repo_full: str, version: str) -> Optional[Tuple[str,
     return None
 
 
+def github_docs_query(repos: List[str]) -> str:
+    fields = []
+    for i, repo_full in enumerate(repos):
+        owner, name = repo_full.split("/", 1)
+        files = "\n".join(
+            f"    f{j}: object(expression: {json.dumps('HEAD:' + p)}) {{ ... on Blob {{ oid }} }}"
+            for j, p in enumerate(README_PATHS + CHANGELOG_PATHS)
+        )
+        fields.append(
+            f"  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{\n"
+            f"    defaultBranchRef {{ name }}\n"
+            f"    latestRelease {{ tagName description }}\n"
+            f"{files}\n"
+            f"  }}"
+        )
+    return "query {\n" + "\n".join(fields) + "\n}"
+
+
+def prefetch_github_docs(repos: List[str]) -> None:
+    # GraphQL needs a token; without one every add-on uses the REST calls.
+    if not (os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN")) or not repos:
+        return
+
+    paths = README_PATHS + CHANGELOG_PATHS
+    for start in range(0, len(repos), GRAPHQL_BATCH_SIZE):
+        batch = repos[start:start + GRAPHQL_BATCH_SIZE]
+        try:
+            r = http.post(GRAPHQL_URL, headers=github_headers(), json={"query": github_docs_query(batch)}, timeout=30)
+            data = (r.json() or {}).get("data") if r.status_code == 200 else None
+        except (requests.RequestException, ValueError) as e:
+            log(f"GRAPHQL ERROR: {e}")
+            continue
+        if not data:
+            log(f"GRAPHQL skip (status {r.status_code}), using REST")
+            continue
+
+        for i, repo_full in enumerate(batch):
+            repo = data.get(f"r{i}") or {}
+            branch = (repo.get("defaultBranchRef") or {}).get("name")
+            if not branch:
+                continue
+            # Only blob ids are queried; the text comes from the cached blob
+            # endpoint, so unchanged docs are not downloaded again.
+            blobs = {}
+            for j, p in enumerate(paths):
+                blob = repo.get(f"f{j}") or {}
+                if blob.get("oid"):
+                    blobs[p] = blob["oid"]
+            _github_prefetch[repo_full] = {
+                "branch": branch,
+                "tree": (blobs, False),
+                "release": repo.get("latestRelease"),
+            }
+
+
+def fetch_release_body(repo_full: str, version: str) -> Optional[Tuple[str, str]]:
+    release = (_github_prefetch.get(repo_full) or {}).get("release") or {}
+    tag_name = (release.get("tagName") or "").strip()
+    body = (release.get("description") or "").strip()
+    if tag_name in (f"v{version}", version) and body:
+        return tag_name, body
+    return github_get_release_body(repo_full, version)
+
+
+URL_SCHEME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.\-]*:")
+IMAGE_EXT_RE = re.compile(r"\.(?:png|jpe?g|gif|svg|webp|avif|bmp|ico)(?:[?#].*)?$", re.I)
+# One pass over the document: code is matched first and kept as-is, so links
+# inside fenced blocks and code spans are left alone.
+MARKDOWN_TOKEN_RE = re.compile(
+    r"(?P<fence>^[ \t]{0,3}(?P<mark>`{3,}|~{3,}).*?(?:^[ \t]{0,3}(?P=mark)[`~]*[ \t]*$|\Z))"
+    r"|(?P<code>(?P<ticks>`+)[^`\n](?:[^\n]*?[^`\n])?(?P=ticks)(?!`))"
+    r"|(?P<html><(?:img|source|a)\b[^>]*>)"
+    # Reference definitions: not footnotes ([^1]:), and the destination may only
+    # be followed by an optional title, so prose like "[Note]: see below" is kept.
+    r"|(?P<ref>^[ \t]{0,3}\[(?!\^)[^\]\n]+\]:[ \t]*)(?P<ref_url><[^>\n]*>|\S+)"
+    r"(?=[ \t]*(?:\"[^\"\n]*\"|'[^'\n]*'|\([^)\n]*\))?[ \t]*$)"
+    r"|(?P<link>(?P<bang>!?)\[(?P<text>(?:[^\[\]\n]|\[[^\[\]\n]*\])*)\]\()"
+    r"(?P<url><[^>\n]*>|(?:[^\s()]|\([^\s()]*\))*)",
+    re.M | re.S,
+)
+HTML_URL_ATTR_RE = re.compile(r"""(\s(src|href|srcset)\s*=\s*)("[^"]*"|'[^']*')""", re.I)
+
+
 def is_relative_url(u: str) -> bool:
     u = (u or "").strip()
     if not u:
         return False
-    if u.startswith(("#", "mailto:", "tel:", "data:")):
-        return False
-    p = urlparse(u)
-    if p.scheme or p.netloc:
+    if u.startswith(("#", "/")):
         return False
-    return not u.startswith("/")
+    return not URL_SCHEME_RE.match(u)
 
 
 def resolve_repo_path(base_file_path: str, rel: str) -> str:
     base_dir = posixpath.dirname(base_file_path)
     joined = posixpath.normpath(posixpath.join(base_dir, rel))
-    return joined.lstrip("./")
+    while joined.startswith("../"):
+        joined = joined[3:]
+    return "" if joined in (".", "..") else joined
 
 
 def rewrite_relative_urls(md: str, repo_full: str, ref: str, source_path: str) -> str:
-    raw_base = f"https://raw.githubusercontent.com/{repo_full}/{ref}/"
-    blob_base = f"https://github.com/{repo_full}/blob/{ref}/"
-
-    def to_raw(rel: str) -> str:
-        return raw_base + resolve_repo_path(source_path, rel)
-
-    def to_blob(rel: str) -> str:
-        return blob_base + resolve_repo_path(source_path, rel)
-
-    def repl_img(m: re.Match) -> str:
-        url = m.group(2)
-        if is_relative_url(url):
-            url = to_raw(url)
-        return f'{m.group(1)}"{url}"'
-
-    md = re.sub(r'(<img[^>]*?\ssrc=)"([^"]+)"', repl_img, md, flags=re.I)
-
-    def repl_a(m: re.Match) -> str:
-        url = m.group(2)
-        if is_relative_url(url):
-            url = to_blob(url)
-        return f'{m.group(1)}"{url}"'
-
-    md = re.sub(r'(<a[^>]*?\shref=)"([^"]+)"', repl_a, md, flags=re.I)
+    bases = {
+        "raw": f"https://raw.githubusercontent.com/{repo_full}/{ref}/",
+        "blob": f"https://github.com/{repo_full}/blob/{ref}/",
+    }
+    resolved: dict = {}
+
+    def rewrite(url: str, kind: str) -> str:
+        key = (url, kind)
+        if key not in resolved:
+            resolved[key] = bases[kind] + resolve_repo_path(source_path, url) if is_relative_url(url) else url
+        return resolved[key]
+
+    def rewrite_bracketed(url: str, kind: str) -> str:
+        if url.startswith("<") and url.endswith(">"):
+            return f"<{rewrite(url[1:-1], kind)}>"
+        return rewrite(url, kind)
+
+    def rewrite_html(tag: str) -> str:
+        image = tag[1:2].lower() != "a"
+
+        def repl_attr(m: re.Match) -> str:
+            quote, value = m.group(3)[0], m.group(3)[1:-1]
+            if m.group(2).lower() == "srcset":
+                candidates = [part.split() for part in value.split(",")]
+                value = ", ".join(" ".join([rewrite(c[0], "raw"), *c[1:]]) for c in candidates if c)
+            else:
+                value = rewrite(value, "raw" if image else "blob")
+            return f"{m.group(1)}{quote}{value}{quote}"
 
-    def repl_md_img(m: re.Match) -> str:
-        alt, url, tail = m.group(1), m.group(2), m.group(3) or ""
-        if is_relative_url(url):
-            url = to_raw(url)
-        return f"![{alt}]({url}{tail})"
+        return HTML_URL_ATTR_RE.sub(repl_attr, tag)
 
-    md = re.sub(r"!\[([^\]]*)\]\((\S+?)(\s+\".*?\")?\)", repl_md_img, md)
+    def repl(m: re.Match) -> str:
+        if m.group("fence") is not None or m.group("code") is not None:
+            return m.group(0)
+        if m.group("html") is not None:
+            return rewrite_html(m.group("html"))
+        if m.group("ref") is not None:
+            url = m.group("ref_url")
+            target = "raw" if IMAGE_EXT_RE.search(url.strip("<>")) else "blob"
+            return m.group("ref") + rewrite_bracketed(url, target)
+        # Link text may hold an image, as in badges: [![alt](img)](link).
+        text = m.group("text")
+        if "](" in text or "<" in text:
+            text = MARKDOWN_TOKEN_RE.sub(repl, text)
+        target = "raw" if m.group("bang") else "blob"
+        return f"{m.group('bang')}[{text}]({rewrite_bracketed(m.group('url'), target)}"
 
-    def repl_md_link(m: re.Match) -> str:
-        text, url, tail = m.group(1), m.group(2), m.group(3) or ""
-        if is_relative_url(url):
-            url = to_blob(url)
-        return f"[{text}]({url}{tail})"
+    return MARKDOWN_TOKEN_RE.sub(repl, md)
 
-    md = re.sub(r"(?<!!)\[([^\]]+)\]\((\S+?)(\s+\".*?\")?\)", repl_md_link, md)
 
-    return md
+def sha256_text(text: Optional[str]) -> Optional[str]:
+    return hashlib.sha256(text.encode()).hexdigest() if text is not None else None
 
 
-def write_if_changed(dst: Path, content: str) -> bool:
+def stage_if_changed(changes: List[dict], dst: Path, content: str) -> bool:
     current = dst.read_text() if dst.exists() else None
     if current == content:
         return False
-    dst.write_text(content)
+    changes.append(
+        {"path": str(dst), "old_sha256": sha256_text(current), "new_sha256": sha256_text(content), "content": content}
+    )
     return True
 
 
-def prepend_release_notes(dst: Path, version: str, body_md: str) -> bool:
+def prepend_release_notes(changes: List[dict], dst: Path, version: str, body_md: str) -> bool:
     existing = dst.read_text() if dst.exists() else ""
     if re.search(rf"^##\s*\[?v?{re.escape(version)}\]?\b", existing, flags=re.M):
         return False
     new_section = f"## {version}\n\n{body_md.strip()}\n\n"
-    dst.write_text(new_section + existing)
-    return True
+    return stage_if_changed(changes, dst, new_section + existing)
 
 
 def apply_local_header(addon_dir: Path, content: str) -> str:
@@ -284,148 +802,271 @@ def apply_local_header(addon_dir: Path, content: str) -> str:
     return header + content
 
 
-def sync_upstream_docs(addon_dir: Path, repo_full: str, version_for_release_fallback: str) -> bool:
-    branch = github_default_branch(repo_full)
+def sync_upstream_docs(
+    changes: List[dict], addon_dir: Path, repo_full: str, version_for_release_fallback: str
+) -> bool:
+    prefetched = _github_prefetch.get(repo_full)
+    branch = prefetched["branch"] if prefetched else github_default_branch(repo_full)
     if not branch:
-        print(f"DOCS   skip ({repo_full} default branch not found)")
+        log(f"DOCS   skip ({repo_full} default branch not found)")
         return False
 
     changed = False
+    tree = prefetched["tree"] if prefetched else github_tree(repo_full, branch)
 
-    readme = github_fetch_first_existing(
-        repo_full,
-        ["README.md", "Readme.md", "readme.md", "docs/README.md", "docs/readme.md"],
-        branch,
-    )
+    readme = github_fetch_first_existing(repo_full, README_PATHS, branch, tree)
     if readme is not None:
         src_path, text = readme
         text = rewrite_relative_urls(text, repo_full, branch, src_path)
         text = apply_local_header(addon_dir, text)
-        if write_if_changed(addon_dir / "README.md", text):
-            print(f"README    {addon_dir/'README.md'} updated from {repo_full}@{branch}")
+        if stage_if_changed(changes, addon_dir / "README.md", text):
+            log(f"README    {addon_dir/'README.md'} updated from {repo_full}@{branch}")
             changed = True
         else:
-            print(f"README    {addon_dir/'README.md'} OK")
+            log(f"README    {addon_dir/'README.md'} OK")
     else:
-        print(f"README    skip ({repo_full}@{branch} README not found)")
-
-    changelog = github_fetch_first_existing(
-        repo_full,
-        [
-            "CHANGELOG.md",
-            "Changelog.md",
-            "changelog.md",
-            "docs/CHANGELOG.md",
-            "docs/Changelog.md",
-            "docs/changelog.md",
-            "CHANGELOG",
-            "Changelog",
-            "changelog",
-        ],
-        branch,
-    )
+        log(f"README    skip ({repo_full}@{branch} README not found)")
+
+    changelog = github_fetch_first_existing(repo_full, CHANGELOG_PATHS, branch, tree)
 
     if changelog is not None:
         src_path, text = changelog
         text = rewrite_relative_urls(text, repo_full, branch, src_path)
-        if write_if_changed(addon_dir / "CHANGELOG.md", text):
-            print(f"CHANGELOG {addon_dir/'CHANGELOG.md'} updated from {repo_full}@{branch}")
+        if stage_if_changed(changes, addon_dir / "CHANGELOG.md", text):
+            log(f"CHANGELOG {addon_dir/'CHANGELOG.md'} updated from {repo_full}@{branch}")
             changed = True
         else:
-            print(f"CHANGELOG {addon_dir/'CHANGELOG.md'} OK")
+            log(f"CHANGELOG {addon_dir/'CHANGELOG.md'} OK")
     else:
-        rel = github_get_release_body(repo_full, version_for_release_fallback)
+        rel = fetch_release_body(repo_full, version_for_release_fallback)
         if rel:
             _, body = rel
-            if prepend_release_notes(addon_dir / "CHANGELOG.md", version_for_release_fallback, body):
-                print(f"CHANGELOG {addon_dir/'CHANGELOG.md'} updated from {repo_full} release notes")
+            if prepend_release_notes(changes, addon_dir / "CHANGELOG.md", version_for_release_fallback, body):
+                log(f"CHANGELOG {addon_dir/'CHANGELOG.md'} updated from {repo_full} release notes")
                 changed = True
             else:
-                print(f"CHANGELOG {addon_dir/'CHANGELOG.md'} already has {version_for_release_fallback}")
+                log(f"CHANGELOG {addon_dir/'CHANGELOG.md'} already has {version_for_release_fallback}")
         else:
-            print(
+            log(
                 f"CHANGELOG skip ({repo_full}: no changelog file and no release notes for {version_for_release_fallback})"
             )
 
     return changed
 
 
-def update_config(path: Path) -> Tuple[bool, bool]:
+def select_version(
+    path: Path,
+    client: RegistryClient,
+    repo: str,
+    data: dict,
+    current: str,
+    current_tag: Optional[str],
+    candidates: List[str],
+) -> str:
+    if not candidates:
+        return current
+
+    # A tag can be pushed before every architecture is. Newer versions must
+    # publish every platform of config.yaml's arch list that the current
+    # version already has; arches upstream never built are not waited for.
+    arches = [str(a) for a in data.get("arch") or []]
+    if not arches:
+        return candidates[0].lstrip("v")
+    counter = getattr(_output, "counter", None)
+
+    def manifest_platforms(tag: str) -> Optional[List[str]]:
+        _output.counter = counter
+        return client.manifest_platforms(repo, tag)
+
+    tags = [current_tag, *candidates] if current_tag else candidates
+    published = list(_manifest_pool.map(manifest_platforms, tags))
+    if not current_tag:
+        log(f"ARCH   {path}: no {current} tag to compare platforms with, taking {candidates[0]}")
+        return candidates[0].lstrip("v")
+    baseline = published.pop(0)
+    if baseline is None:
+        log(f"SKIP   {path} (could not read the manifest of {current_tag}, keeping {current})")
+        return current
+    required = [HA_ARCH_PLATFORMS.get(arch, arch) for arch in arches]
+    required = [platform for platform in required if platform in baseline]
+
+    for tag, platforms in zip(candidates, published):
+        if platforms is None:
+            log(f"SKIP   {path} (could not read the manifest of {tag}, keeping {current})")
+            return current
+        missing = [platform for platform in required if platform not in platforms]
+        if not missing:
+            return tag.lstrip("v")
+        log(f"WAIT   {path}: {tag} missing {', '.join(missing)}")
+    log(f"SKIP   {path} (no fully published version among {', '.join(candidates)}, keeping {current})")
+    return current
+
+
+def update_config(path: Path, changes: List[dict]) -> Tuple[Optional[str], Optional[str]]:
     yaml = YAML()
     yaml.preserve_quotes = True
 
     data = yaml.load(path.read_text())
     if not isinstance(data, dict):
-        return False, False
+        return None, None
 
     image = data.get("image")
     if not image:
-        return False, False
-
-    registry, repo = parse_image(str(image))
-    if registry != "ghcr.io":
-        print(f"SKIP   {path} (registry {registry})")
-        return False, False
+        return None, None
 
-    tags = list_ghcr_tags(repo)
-    latest = latest_semver(tags)
-    if not latest:
-        print(f"SKIP   {path} (no semver tags)")
-        return False, False
-
-    new_version = latest.lstrip("v")
     current = str(data.get("version", "")).strip().strip('"')
+    registry, repo = parse_image(str(image))
+    client = registry_client(registry)
+    candidates = client.semver_candidates(repo)
+    if not candidates:
+        log(f"SKIP   {path} (no semver tags)")
+        return current, None
+
+    # Never move to a version at or below the current one, whatever the
+    # registry says about it.
+    try:
+        current_version = Version(current.lstrip("v"))
+    except InvalidVersion:
+        current_version = None
+    current_tag = None
+    if current_version is not None:
+        current_tag = next((tag for tag in candidates if Version(tag.lstrip("v")) == current_version), None)
+        candidates = [tag for tag in candidates if Version(tag.lstrip("v")) > current_version]
+
+    new_version = select_version(path, client, repo, data, current, current_tag, candidates)
 
-    version_changed = False
     if current != new_version:
         data["version"] = new_version
-        with path.open("w") as f:
-            yaml.dump(data, f)
-        print(f"UPDATE {path}: {current} → {new_version}")
-        version_changed = True
+        out = StringIO()
+        yaml.dump(data, out)
+        stage_if_changed(changes, path, out.getvalue())
+        log(f"UPDATE {path}: {current} → {new_version}")
     else:
-        print(f"OK     {path} ({current})")
+        log(f"OK     {path} ({current})")
 
     addon_dir = path.parent
     repo_url = data.get("repo")
     repo_full = github_repo_full_from_url(str(repo_url)) if repo_url else None
 
-    docs_changed = False
     if repo_full:
         try:
-            docs_changed = sync_upstream_docs(addon_dir, repo_full, new_version)
+            sync_upstream_docs(changes, addon_dir, repo_full, new_version)
         except Exception as e:
-            print(f"DOCS   ERROR {path}: {e}")
+            log(f"DOCS   ERROR {path}: {e}")
     else:
         if repo_url:
-            print(f"DOCS   skip (invalid repo URL: {repo_url})")
+            log(f"DOCS   skip (invalid repo URL: {repo_url})")
         else:
-            print("DOCS   skip (no repo: field in config.yaml)")
+            log("DOCS   skip (no repo: field in config.yaml)")
+
+    return current, new_version
 
-    return version_changed, docs_changed
+
+def config_repo(path: Path) -> Optional[str]:
+    try:
+        data = YAML(typ="safe").load(path.read_text())
+    except Exception:
+        return None
+    if not isinstance(data, dict) or not data.get("repo"):
+        return None
+    return github_repo_full_from_url(str(data["repo"]))
+
+
+def run_update(cfg: Path) -> dict:
+    # Output is collected per add-on so that concurrent runs still print in order.
+    _output.lines = []
+    _output.counter = {"requests": 0}
+    entry = {"config": str(cfg), "old_version": None, "new_version": None, "changes": [], "error": None}
+    started = time.monotonic()
+    try:
+        entry["old_version"], entry["new_version"] = update_config(cfg, entry["changes"])
+    except Exception as e:
+        log(f"ERROR  {cfg}: {e}")
+        entry["error"] = str(e)
+    finally:
+        entry["requests"] = _output.counter["requests"]
+        entry["seconds"] = round(time.monotonic() - started, 3)
+        entry["log"] = _output.lines
+        _output.lines = None
+        _output.counter = None
+    return entry
+
+
+def build_plan(configs: List[Path]) -> dict:
+    started = time.monotonic()
+    prefetch_github_docs(sorted({repo for repo in map(config_repo, configs) if repo}))
+
+    addons = []
+    with ThreadPoolExecutor(max_workers=min(CONCURRENCY, len(configs))) as pool:
+        for entry in pool.map(run_update, configs):
+            for line in entry["log"]:
+                print(line)
+            addons.append(entry)
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seconds": round(time.monotonic() - started, 3),
+        "requests": _request_count["n"],
+        "not_modified": _cache_stats["not_modified"],
+        "changes": sum(len(entry["changes"]) for entry in addons),
+        "addons": addons,
+    }
+
+
+def apply_plan(plan: dict) -> int:
+    written = 0
+    for entry in plan["addons"]:
+        for change in entry["changes"]:
+            dst = Path(change["path"])
+            current = sha256_text(dst.read_text() if dst.exists() else None)
+            if current == change["new_sha256"]:
+                continue
+            if current != change["old_sha256"]:
+                print(f"STALE  {dst} changed since the plan was made, skipped")
+                continue
+            dst.write_text(change["content"])
+            written += 1
+    return written
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Update add-on versions and docs from their upstream images and repositories.")
+    parser.add_argument("--dry-run", action="store_true", help="compute the plan without writing any files")
+    parser.add_argument("--plan-out", type=Path, metavar="PATH", help="write the plan as JSON to PATH")
+    parser.add_argument("--apply", type=Path, metavar="PLAN", help="write the changes from a saved plan, without any network calls")
+    args = parser.parse_args()
+
+    if args.apply:
+        plan = json.loads(args.apply.read_text())
+        written = apply_plan(plan)
+        print(f"Done. Applied {written} of {plan['changes']} changes from {args.apply}.")
+        return
+
     configs = sorted(Path(".").glob("*/config.yaml"))
     if not configs:
         print("No ./*/config.yaml files found")
         return
 
-    updated_versions = 0
-    updated_docs = 0
+    plan = build_plan(configs)
+    pruned = prune_cache()
+    if pruned:
+        print(f"CACHE  removed {pruned} entries unused for {CACHE_MAX_AGE_SECONDS / 86400:g} days")
+    if args.plan_out:
+        args.plan_out.write_text(json.dumps(plan, indent=2) + "\n")
+    if not args.dry_run:
+        apply_plan(plan)
 
-    for cfg in configs:
-        try:
-            v_changed, d_changed = update_config(cfg)
-            if v_changed:
-                updated_versions += 1
-            if d_changed:
-                updated_docs += 1
-        except Exception as e:
-            print(f"ERROR  {cfg}: {e}")
+    print("\nTimings:")
+    for entry in plan["addons"]:
+        print(f"TIME   {Path(entry['config']).parent}: {entry['seconds']:.2f}s, {entry['requests']} requests")
+    print(f"TIME   total: {plan['seconds']:.2f}s")
+    print(f"HTTP   {plan['requests']} requests, {plan['not_modified']} not modified")
 
-    print(f"\nDone. Updated versions: {updated_versions}. Updated docs: {updated_docs}.")
+    updated_versions = sum(1 for entry in plan["addons"] if any(c["path"] == entry["config"] for c in entry["changes"]))
+    updated_docs = sum(1 for entry in plan["addons"] if any(c["path"] != entry["config"] for c in entry["changes"]))
+    mode = " (dry run, nothing written)" if args.dry_run else ""
+    print(f"\nDone{mode}. Updated versions: {updated_versions}. Updated docs: {updated_docs}.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,18 +1,44 @@
 import asyncio
+import hashlib
 import json
+import logging
+import logging.handlers
+import math
 import os
+import queue
+import secrets
 import socket
 import sys
+import threading
 import time
-from collections import deque
-from contextlib import asynccontextmanager, suppress
-from typing import Deque, Optional
+import traceback
+from array import array
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager, suppress
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Optional
 
 import httpx
+import uvicorn
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from pydantic import BaseModel, Field
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    from websockets.asyncio.client import unix_connect as websocket_unix_connect
+except ImportError:
+    websocket_unix_connect = None
+
 # =========================
 # Configuration
 # =========================
@@ -22,6 +48,186 @@ APP_PORT = int("8099")
 APP_BASE_URL = os.getenv('APP_BASE_URL', f"http://{os.getenv('HOME_ASSISTANT_IP', '127.0.0.1')}:{APP_PORT}").rstrip('/')
 HA_TOKEN = os.getenv("HA_TOKEN", "")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+EVENT_LOOP = os.getenv("EVENT_LOOP", "auto")
+WORKERS = max(1, int(os.getenv("WORKERS", "1")))
+DATA_DIR = os.getenv("DATA_DIR", "/data")
+READINESS_TIMEOUT = max(1.0, float(os.getenv("READINESS_TIMEOUT", "15")))
+READINESS_QUORUM = min(1.0, max(0.01, float(os.getenv("READINESS_QUORUM", "1.0"))))
+PARTIAL_READY_TARGETS = max(0, int(os.getenv("PARTIAL_READY_TARGETS", "0")))
+READINESS_HISTORY_PATH = os.path.join(DATA_DIR, "readiness_history.json")
+READINESS_HISTORY_SAMPLES = 50
+# A target counts as an outlier once it is this much slower than its own p95.
+READINESS_OUTLIER_FACTOR = 1.5
+READINESS_OUTLIER_GRACE = 1.0
+READY_STATES = {"buffering", "playing"}
+# Keep enough MP3 (48 kbit/s, 6000 bytes per second) for a target that only
+# becomes ready at the readiness deadline to start from the beginning.
+MP3_BYTES_PER_SECOND = 6000
+RECENT_BUFFER_CHUNKS = max(256, math.ceil((READINESS_TIMEOUT + 5) * MP3_BYTES_PER_SECOND / 1024))
+SPEAK_IMMEDIATELY = os.getenv("SPEAK_IMMEDIATELY", "false").lower() == "true"
+# Live listeners get whatever MP3 piled up during this window in one write.
+STREAM_FLUSH_SECONDS = max(0, int(os.getenv("STREAM_FLUSH_MS", "20"))) / 1000
+ICY_METAINT = 8000
+MAX_LISTENERS_PER_IP = max(1, int(os.getenv("MAX_LISTENERS_PER_IP", "4")))
+
+# Browser audio arrives as 48 kHz mono s16le PCM.
+PCM_SAMPLE_RATE = 48000
+PCM_SEGMENT_SAMPLES = PCM_SAMPLE_RATE // 100
+PREROLL_MAX_SECONDS = 30
+# While catching up, silent stretches are cut down to this length and one in
+# every PREROLL_DROP_EVERY speech segments is skipped (about 1.25x speed).
+PREROLL_KEEP_SILENCE_SECONDS = 0.25
+PREROLL_DROP_EVERY = 5
+PREROLL_CROSSFADE_SAMPLES = 48
+PREROLL_SILENCE_RMS = 180.0
+PREROLL_LEAD_SECONDS = 0.2
+
+SILENCE_GATE = os.getenv("SILENCE_GATE", "false").lower() == "true"
+SILENCE_GATE_THRESHOLD_DB = float(os.getenv("SILENCE_GATE_THRESHOLD_DB", "-50"))
+SILENCE_GATE_HANGOVER_SECONDS = 0.3
+
+DSP_ENABLED = os.getenv("DSP_ENABLED", "false").lower() == "true"
+DSP_TARGET_LEVEL_DB = float(os.getenv("DSP_TARGET_LEVEL_DB", "-20"))
+DSP_HIGHPASS_HZ = 80.0
+DSP_MAX_GAIN_DB = 18.0
+DSP_MIN_GAIN_DB = -12.0
+# Frames quieter than this leave the AGC gain unchanged so that room noise is
+# not pulled up to speech level between sentences.
+DSP_AGC_FLOOR_DB = -55.0
+DSP_COMPRESSOR_RATIO = 4.0
+DSP_LIMITER_CEILING_DB = -1.0
+DSP_BLOCK_SAMPLES = 120
+DSP_HIGHPASS_BLOCK_SAMPLES = 512
+
+CLIPS_DIR = os.getenv("CLIPS_DIR", "/media/pa_system")
+CLIP_CACHE_DIR = os.path.join(DATA_DIR, "clip_cache")
+CLIP_EXTENSIONS = {".mp3", ".wav", ".ogg", ".oga", ".opus", ".flac", ".m4a", ".aac"}
+CLIP_MEMORY_CACHE_BYTES = 8 * 1024 * 1024
+CLIP_DISK_CACHE_BYTES = 64 * 1024 * 1024
+# Clips are published slightly ahead of real time; standalone clips wait this
+# long after the last frame so speakers can play out their own buffer.
+CLIP_LEAD_SECONDS = 0.5
+CLIP_TAIL_SECONDS = 3.0
+
+GROUP_HOLD_SECONDS = max(0.0, float(os.getenv("GROUP_HOLD_SECONDS", "15")))
+RESTORE_STATE = os.getenv("RESTORE_STATE", "true").lower() == "true"
+
+ANNOUNCEMENT_KINDS = {"live", "clip", "tts"}
+ANNOUNCEMENT_DEFAULT_PRIORITY = 50
+# Announcements at or above this priority interrupt a running announcement
+# with a lower priority instead of waiting for it to finish.
+ANNOUNCEMENT_PREEMPT_PRIORITY = 80
+ANNOUNCEMENT_HISTORY = 50
+# A queued live announcement ends if its recorder has not connected within
+# this long of the speakers becoming ready, so the queue keeps moving.
+ANNOUNCEMENT_RECORDER_WAIT_SECONDS = 30.0
+
+LAN_IP_REFRESH_SECONDS = 60.0
+
+# With several workers, the worker holding the owner lock runs the encoder,
+# sessions and scheduler, and serves them to the other workers over a Unix
+# socket. Every worker can answer the routes below on its own.
+SHARED_STATE_DIR = os.getenv("SHARED_STATE_DIR", "/dev/shm/pa_system")
+OWNER_LOCK_PATH = os.path.join(SHARED_STATE_DIR, "owner.lock")
+OWNER_SOCKET_PATH = os.path.join(SHARED_STATE_DIR, "owner.sock")
+SHARED_STATE_PATH = os.path.join(SHARED_STATE_DIR, "state.json")
+SHARED_STATE_INTERVAL_SECONDS = 0.5
+SHARED_STATE_STALE_SECONDS = 5.0
+OWNER_RETRY_SECONDS = 2.0
+WORKER_LOCAL_PATHS = {"/", "/api/targets", "/api/status", "/api/clips", "/health", "/health/live", "/health/ready"}
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "upgrade", "te", "trailer", "proxy-connection"}
+
+WATCHDOG_INTERVAL_SECONDS = 0.1
+# The loop counts as blocked once its heartbeat is this late; the watchdog
+# thread then captures the loop thread's stack to show what is blocking it.
+WATCHDOG_BLOCK_SECONDS = 0.2
+WATCHDOG_SAMPLES = 600
+
+# Every MP3 frame must decode on its own (no bit reservoir) so that pre-encoded
+# frames can be spliced between frames coming out of the live encoder.
+MP3_ENCODER_ARGS = [
+    "-vn",
+    "-ac",
+    "1",
+    "-ar",
+    "24000",
+    "-b:a",
+    "48k",
+    "-reservoir",
+    "0",
+    "-f",
+    "mp3",
+]
+
+
+# =========================
+# Logging
+# =========================
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+LOG_LEVELS = {
+    "trace": TRACE,
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
+logger = logging.getLogger("pa_system")
+log_listener: Optional[logging.handlers.QueueListener] = None
+log_samples: dict[str, list] = {}
+
+
+def configure_logging() -> None:
+    global log_listener
+
+    # Records are handed to a background thread, so a slow stdout never
+    # blocks the event loop.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    log_listener = logging.handlers.QueueListener(log_queue, handler)
+    logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    logger.setLevel(LOG_LEVELS.get(LOG_LEVEL.lower(), logging.INFO))
+    logger.propagate = False
+    log_listener.start()
+
+
+def log_value(value) -> str:
+    if isinstance(value, float):
+        return str(round(value, 3))
+    if not isinstance(value, str):
+        return json.dumps(value, default=str, separators=(",", ":"))
+    if not value or any(char.isspace() or char in '="' for char in value):
+        return json.dumps(value)
+    return value
+
+
+def log_event(level: int, event: str, **fields) -> None:
+    if not logger.isEnabledFor(level):
+        return
+    if fields:
+        logger.log(level, "%s %s", event, " ".join(f"{key}={log_value(value)}" for key, value in fields.items()))
+    else:
+        logger.log(level, "%s", event)
+
+
+def log_sampled(key: str, interval: float, level: int, event: str, **fields) -> None:
+    if not logger.isEnabledFor(level):
+        return
+    now = time.monotonic()
+    sample = log_samples.setdefault(key, [-interval, 0])
+    if now - sample[0] < interval:
+        sample[1] += 1
+        return
+    if sample[1]:
+        fields["suppressed"] = sample[1]
+    sample[0] = now
+    sample[1] = 0
+    log_event(level, event, **fields)
+
+
+configure_logging()
 
 
 def _load_targets() -> list[dict]:
@@ -77,15 +283,577 @@ async def lifespan(app: FastAPI):
         timeout=httpx.Timeout(20.0, connect=5.0),
         limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
     )
+    if DSP_ENABLED and np is None:
+        log_event(logging.WARNING, "dsp_disabled", reason="numpy is not installed")
+    startup = [refresh_lan_ip()]
+    if worker.claim_ownership():
+        startup.append(start_owner_services())
+    else:
+        log_event(logging.INFO, "worker_started", pid=os.getpid(), owner=False)
+        worker.promotion_task = asyncio.create_task(wait_for_ownership())
+    await asyncio.gather(*startup)
+    lan_ip_task = asyncio.create_task(refresh_lan_ip_periodically())
+    watchdog.start()
+    app.state.started = True
     try:
         yield
     finally:
-        await engine.stop()
+        app.state.started = False
+        await watchdog.stop()
+        lan_ip_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await lan_ip_task
+        await worker.stop()
+        if worker.owner:
+            await stop_owner_services()
         with suppress(Exception):
             await app.state.ha_client.aclose()
+        if log_listener:
+            log_listener.stop()
+
+
+async def start_owner_services() -> None:
+    await asyncio.to_thread(readiness_history.load)
+    if engine.gate:
+        engine.set_silent_frame(await encode_silent_mp3_frame())
+        if not engine.silent_frame:
+            log_event(logging.WARNING, "silence_gate_disabled", reason="no silent MP3 frame available")
+    scheduler.task = asyncio.create_task(run_announcement_scheduler())
+    if WORKERS > 1:
+        await worker.serve_owner_socket()
+    log_event(logging.INFO, "worker_started", pid=os.getpid(), owner=True, workers=WORKERS)
+
+
+async def stop_owner_services() -> None:
+    if scheduler.task:
+        scheduler.task.cancel()
+        with suppress(asyncio.CancelledError):
+            await scheduler.task
+    with suppress(Exception):
+        await release_held_group()
+    await engine.stop()
+
+
+async def wait_for_ownership() -> None:
+    while not worker.claim_ownership():
+        await asyncio.sleep(OWNER_RETRY_SECONDS)
+    log_event(logging.WARNING, "worker_promoted", pid=os.getpid())
+    await start_owner_services()
+
+
+class OwnerSocketServer(uvicorn.Server):
+    @contextmanager
+    def capture_signals(self):
+        # Signals belong to the worker's main server, which shuts this one down.
+        yield
+
+
+class WorkerRole:
+    def __init__(self) -> None:
+        self.owner = False
+        self.lock_fd: Optional[int] = None
+        self.server: Optional[OwnerSocketServer] = None
+        self.server_task: Optional[asyncio.Task] = None
+        self.publish_task: Optional[asyncio.Task] = None
+        self.promotion_task: Optional[asyncio.Task] = None
+        self.owner_client: Optional[httpx.AsyncClient] = None
+
+    def claim_ownership(self) -> bool:
+        if self.owner:
+            return True
+        if WORKERS == 1 or fcntl is None:
+            self.owner = True
+            return True
+
+        os.makedirs(SHARED_STATE_DIR, exist_ok=True)
+        fd = os.open(OWNER_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self.lock_fd = fd
+        self.owner = True
+        return True
+
+    async def serve_owner_socket(self) -> None:
+        with suppress(FileNotFoundError):
+            os.unlink(OWNER_SOCKET_PATH)
+        config = uvicorn.Config(
+            app,
+            uds=OWNER_SOCKET_PATH,
+            lifespan="off",
+            log_config=None,
+            access_log=False,
+            proxy_headers=True,
+            forwarded_allow_ips="*",
+        )
+        self.server = OwnerSocketServer(config)
+        self.server_task = asyncio.create_task(self.server.serve())
+        self.publish_task = asyncio.create_task(self._publish_state())
+
+    async def _publish_state(self) -> None:
+        previous = None
+        while True:
+            payload = json.dumps(status_payload(), default=str)
+            if payload != previous:
+                await asyncio.to_thread(self._write_state, payload)
+                previous = payload
+            else:
+                await asyncio.to_thread(os.utime, SHARED_STATE_PATH)
+            await asyncio.sleep(SHARED_STATE_INTERVAL_SECONDS)
+
+    def _write_state(self, payload: str) -> None:
+        tmp_path = f"{SHARED_STATE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(payload)
+        os.replace(tmp_path, SHARED_STATE_PATH)
+
+    def read_state(self) -> Optional[dict]:
+        try:
+            if time.time() - os.stat(SHARED_STATE_PATH).st_mtime > SHARED_STATE_STALE_SECONDS:
+                return None
+            with open(SHARED_STATE_PATH, "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def client(self) -> httpx.AsyncClient:
+        if self.owner_client is None:
+            self.owner_client = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(uds=OWNER_SOCKET_PATH),
+                base_url="http://owner",
+                timeout=httpx.Timeout(60.0, connect=2.0, read=None),
+            )
+        return self.owner_client
+
+    async def stop(self) -> None:
+        for task in (self.promotion_task, self.publish_task):
+            if task:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        if self.server and self.server_task:
+            self.server.should_exit = True
+            with suppress(Exception):
+                await self.server_task
+        if self.owner_client:
+            with suppress(Exception):
+                await self.owner_client.aclose()
+
+
+class OwnerProxyMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if worker.owner or scope["type"] not in ("http", "websocket") or scope["path"] in WORKER_LOCAL_PATHS:
+            await self.app(scope, receive, send)
+        elif scope["type"] == "http":
+            await self.proxy_http(scope, receive, send)
+        else:
+            await self.proxy_websocket(scope, receive, send)
+
+    def upstream_target(self, scope) -> str:
+        query = scope.get("query_string", b"").decode("latin-1")
+        return f"{scope['path']}?{query}" if query else scope["path"]
+
+    def upstream_headers(self, scope) -> list[tuple[str, str]]:
+        headers = [
+            (key.decode("latin-1"), value.decode("latin-1"))
+            for key, value in scope["headers"]
+            if key.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+        ]
+        client = scope.get("client")
+        if client and not any(key.lower() == "x-forwarded-for" for key, _ in headers):
+            headers.append(("x-forwarded-for", client[0]))
+        return headers
+
+    async def proxy_http(self, scope, receive, send) -> None:
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        client = worker.client()
+        request = client.build_request(
+            scope["method"],
+            self.upstream_target(scope),
+            headers=self.upstream_headers(scope),
+            content=bytes(body),
+        )
+        try:
+            response = await client.send(request, stream=True)
+        except httpx.TransportError as exc:
+            log_sampled("owner_unreachable", 5.0, logging.WARNING, "owner_unreachable", error=str(exc))
+            await JSONResponse(status_code=503, content={"detail": "Encoder worker is not available"})(scope, receive, send)
+            return
+
+        async def forward() -> None:
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (key, value)
+                    for key, value in response.headers.raw
+                    if key.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+                ],
+            })
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def wait_for_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        tasks = [asyncio.create_task(forward()), asyncio.create_task(wait_for_disconnect())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await response.aclose()
+
+    async def proxy_websocket(self, scope, receive, send) -> None:
+        if (await receive())["type"] != "websocket.connect":
+            return
+        if websocket_unix_connect is None:
+            await send({"type": "websocket.close", "code": 1011})
+            return
+        try:
+            upstream = await websocket_unix_connect(
+                OWNER_SOCKET_PATH,
+                f"ws://owner{self.upstream_target(scope)}",
+                max_size=None,
+            )
+        except Exception as exc:
+            log_event(logging.WARNING, "owner_unreachable", error=str(exc))
+            await send({"type": "websocket.close", "code": 1011})
+            return
+
+        await send({"type": "websocket.accept"})
+
+        async def client_to_owner() -> None:
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                data = message.get("bytes")
+                await upstream.send(data if data is not None else message.get("text", ""))
+
+        async def owner_to_client() -> None:
+            with suppress(Exception):
+                async for data in upstream:
+                    key = "bytes" if isinstance(data, bytes) else "text"
+                    await send({"type": "websocket.send", key: data})
+            with suppress(Exception):
+                await send({"type": "websocket.close", "code": upstream.close_code or 1000})
+
+        tasks = [asyncio.create_task(client_to_owner()), asyncio.create_task(owner_to_client())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            with suppress(Exception):
+                await upstream.close()
 
 
 app = FastAPI(title="PA System", lifespan=lifespan)
+app.add_middleware(OwnerProxyMiddleware)
+
+
+MP3_BITRATES = {
+    "mpeg1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "mpeg2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+
+def mp3_frame_info(header: bytes) -> Optional[tuple[int, float]]:
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        bitrate = MP3_BITRATES["mpeg1"][bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, 1152 / sample_rate
+    bitrate = MP3_BITRATES["mpeg2"][bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, 576 / sample_rate
+
+
+class Mp3FrameSplitter:
+    def __init__(self) -> None:
+        self.pending = bytearray()
+
+    def feed(self, data: bytes) -> list[bytes]:
+        self.pending.extend(data)
+        frames: list[bytes] = []
+        while len(self.pending) >= 10:
+            if self.pending[:3] == b"ID3":
+                size = 10 + (
+                    (self.pending[6] & 0x7F) << 21
+                    | (self.pending[7] & 0x7F) << 14
+                    | (self.pending[8] & 0x7F) << 7
+                    | (self.pending[9] & 0x7F)
+                )
+                if self.pending[5] & 0x10:
+                    size += 10
+                if len(self.pending) < size:
+                    break
+                del self.pending[:size]
+                continue
+
+            info = mp3_frame_info(self.pending[:4])
+            if info is None:
+                sync = self.pending.find(b"\xff", 1)
+                del self.pending[: sync if sync > 0 else len(self.pending)]
+                continue
+            length = info[0]
+            if len(self.pending) < length:
+                break
+            frames.append(bytes(self.pending[:length]))
+            del self.pending[:length]
+        return frames
+
+
+async def encode_silent_mp3_frame() -> Optional[bytes]:
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "anullsrc=r=24000:cl=mono",
+            "-t",
+            "1",
+            *MP3_ENCODER_ARGS,
+            "-write_xing",
+            "0",
+            "-id3v2_version",
+            "0",
+            "pipe:1",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+    except OSError as exc:
+        log_event(logging.ERROR, "silent_frame_failed", error=str(exc))
+        return None
+
+    frames = Mp3FrameSplitter().feed(stdout)
+    if proc.returncode != 0 or len(frames) < 3:
+        log_event(logging.ERROR, "silent_frame_failed", error=stderr.decode(errors="ignore").strip())
+        return None
+    # The first and last frames carry encoder delay and padding.
+    return frames[len(frames) // 2]
+
+
+def db_to_gain(value: float) -> float:
+    return 10.0 ** (value / 20.0)
+
+
+def gain_to_db(value: float) -> float:
+    return 20.0 * math.log10(max(value, 1e-9))
+
+
+class DspChain:
+    def __init__(self, max_samples: int = 8192) -> None:
+        self.highpass_coeff = math.exp(-2.0 * math.pi * DSP_HIGHPASS_HZ / PCM_SAMPLE_RATE)
+        self.highpass_x = 0.0
+        self.highpass_y = 0.0
+        self.agc_gain_db = 0.0
+        self.compressor_gr_db = 0.0
+        self.limiter_gain = 1.0
+        self.target_rms = db_to_gain(DSP_TARGET_LEVEL_DB)
+        self.agc_floor_rms = db_to_gain(DSP_AGC_FLOOR_DB)
+        self.compressor_threshold_db = DSP_TARGET_LEVEL_DB + 6.0
+        self.ceiling = db_to_gain(DSP_LIMITER_CEILING_DB)
+        block_seconds = DSP_BLOCK_SAMPLES / PCM_SAMPLE_RATE
+        self.attack = 1.0 - math.exp(-block_seconds / 0.005)
+        self.release = 1.0 - math.exp(-block_seconds / 0.150)
+        self.frames = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._allocate(max_samples)
+
+    def _allocate(self, max_samples: int) -> None:
+        # One-pole high-pass filter solved per block with a scaled cumulative
+        # sum: y[n] = a^(n+1) * (y[-1] + sum(a^-k * (x[k] - x[k-1]))).
+        powers = np.arange(DSP_HIGHPASS_BLOCK_SAMPLES, dtype=np.float64)
+        self.highpass_up = self.highpass_coeff ** (powers + 1.0)
+        self.highpass_down = self.highpass_coeff ** -powers
+        self.max_samples = max_samples
+        self.work = np.zeros(max_samples, dtype=np.float64)
+        self.scratch = np.zeros(max_samples, dtype=np.float64)
+        self.ramp = np.arange(1, max_samples + 1, dtype=np.float64)
+        self.output = np.zeros(max_samples, dtype=np.int16)
+        blocks = math.ceil(max_samples / DSP_BLOCK_SAMPLES)
+        self.peaks = np.zeros(blocks, dtype=np.float64)
+        self.gains = np.zeros(blocks, dtype=np.float64)
+
+    def process(self, data: bytes) -> bytes:
+        started = time.perf_counter()
+        samples = np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+        count = len(samples)
+        if count == 0:
+            return data
+        if count > self.max_samples:
+            self._allocate(count)
+
+        work = self.work[:count]
+        np.multiply(samples, 1.0 / 32768.0, out=work)
+        self._highpass(work)
+        self._agc(work)
+        self._compress_and_limit(work)
+
+        np.multiply(work, 32767.0, out=work)
+        np.rint(work, out=work)
+        output = self.output[:count]
+        np.copyto(output, work, casting="unsafe")
+
+        elapsed = time.perf_counter() - started
+        self.frames += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        return output.astype("<i2", copy=False).tobytes()
+
+    def _highpass(self, work) -> None:
+        for start in range(0, len(work), DSP_HIGHPASS_BLOCK_SAMPLES):
+            block = work[start:start + DSP_HIGHPASS_BLOCK_SAMPLES]
+            size = len(block)
+            diff = self.scratch[:size]
+            diff[0] = block[0] - self.highpass_x
+            np.subtract(block[1:], block[:-1], out=diff[1:])
+            self.highpass_x = float(block[-1])
+            np.multiply(diff, self.highpass_down[:size], out=diff)
+            np.cumsum(diff, out=diff)
+            diff += self.highpass_y
+            np.multiply(diff, self.highpass_up[:size], out=block)
+            self.highpass_y = float(block[-1])
+
+    def _agc(self, work) -> None:
+        count = len(work)
+        rms = math.sqrt(float(np.dot(work, work)) / count)
+        previous = self.agc_gain_db
+        if rms >= self.agc_floor_rms:
+            desired = min(DSP_MAX_GAIN_DB, max(DSP_MIN_GAIN_DB, gain_to_db(self.target_rms / rms)))
+            rate = 0.5 if desired < previous else 0.05
+            self.agc_gain_db = previous + (desired - previous) * rate
+
+        start_gain = db_to_gain(previous)
+        end_gain = db_to_gain(self.agc_gain_db)
+        ramp = self.scratch[:count]
+        np.multiply(self.ramp[:count], (end_gain - start_gain) / count, out=ramp)
+        ramp += start_gain
+        work *= ramp
+
+    def _compress_and_limit(self, work) -> None:
+        count = len(work)
+        full = count // DSP_BLOCK_SAMPLES
+        blocks = math.ceil(count / DSP_BLOCK_SAMPLES)
+        magnitude = self.scratch[:count]
+        np.abs(work, out=magnitude)
+        peaks = self.peaks[:blocks]
+        if full:
+            magnitude[: full * DSP_BLOCK_SAMPLES].reshape(full, DSP_BLOCK_SAMPLES).max(axis=1, out=peaks[:full])
+        if blocks > full:
+            peaks[full] = magnitude[full * DSP_BLOCK_SAMPLES:].max()
+
+        gains = self.gains[:blocks]
+        slope = 1.0 - 1.0 / DSP_COMPRESSOR_RATIO
+        for index, peak in enumerate(peaks.tolist()):
+            over = gain_to_db(peak) - self.compressor_threshold_db
+            target_gr = over * slope if over > 0 else 0.0
+            rate = self.attack if target_gr > self.compressor_gr_db else self.release
+            self.compressor_gr_db += (target_gr - self.compressor_gr_db) * rate
+            gain = db_to_gain(-self.compressor_gr_db)
+
+            limited = peak * gain
+            needed = self.ceiling / limited if limited > self.ceiling else 1.0
+            if needed < self.limiter_gain:
+                self.limiter_gain = needed
+            else:
+                self.limiter_gain += (1.0 - self.limiter_gain) * self.release
+            gains[index] = gain * self.limiter_gain
+
+        if full:
+            shaped = work[: full * DSP_BLOCK_SAMPLES].reshape(full, DSP_BLOCK_SAMPLES)
+            shaped *= gains[:full, None]
+        if blocks > full:
+            work[full * DSP_BLOCK_SAMPLES:] *= gains[full]
+        np.clip(work, -self.ceiling, self.ceiling, out=work)
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "avg_frame_ms": round(self.total_seconds / self.frames * 1000.0, 3) if self.frames else None,
+            "max_frame_ms": round(self.max_seconds * 1000.0, 3),
+            "agc_gain_db": round(self.agc_gain_db, 1),
+            "compressor_gr_db": round(self.compressor_gr_db, 1),
+            "limiter_gain_db": round(gain_to_db(self.limiter_gain), 1),
+        }
+
+
+class SilenceGate:
+    def __init__(self, threshold_db: float) -> None:
+        self.threshold_rms = 32768.0 * (10.0 ** (threshold_db / 20.0))
+        self.hangover = int(SILENCE_GATE_HANGOVER_SECONDS * PCM_SAMPLE_RATE)
+        self.reset()
+
+    def reset(self) -> None:
+        self.open = False
+        self.quiet_samples = 0
+        self.speech_seconds = 0.0
+        self.silence_seconds = 0.0
+        self.gated_frames = 0
+
+    def is_speech(self, samples: array) -> bool:
+        seconds = len(samples) / PCM_SAMPLE_RATE
+        if pcm_rms(samples) >= self.threshold_rms:
+            self.open = True
+            self.quiet_samples = 0
+        elif self.open:
+            self.quiet_samples += len(samples)
+            if self.quiet_samples > self.hangover:
+                self.open = False
+
+        if self.open:
+            self.speech_seconds += seconds
+        else:
+            self.silence_seconds += seconds
+        return self.open
+
+    def stats(self) -> dict:
+        total = self.speech_seconds + self.silence_seconds
+        return {
+            "open": self.open,
+            "speech_seconds": round(self.speech_seconds, 2),
+            "silence_seconds": round(self.silence_seconds, 2),
+            "speech_ratio": round(self.speech_seconds / total, 3) if total else None,
+            "gated_frames": self.gated_frames,
+        }
 
 
 class AudioEngine:
@@ -96,10 +864,31 @@ class AudioEngine:
         self.broadcast_task: Optional[asyncio.Task] = None
         self.stderr_task: Optional[asyncio.Task] = None
         self.listeners: set[asyncio.Queue[bytes]] = set()
+        self.listener_hosts: dict[asyncio.Queue[bytes], str] = {}
+        # How far behind live each listener plays, from the backlog it joined with.
+        self.listener_lags: dict[asyncio.Queue[bytes], float] = {}
+        self.last_publish_at = 0.0
         self.listeners_lock = asyncio.Lock()
-        self.recent_buffer: Deque[bytes] = deque(maxlen=256)
+        self.stream_token: Optional[str] = None
+        self.recent_buffer: Deque[bytes] = deque(maxlen=RECENT_BUFFER_CHUNKS)
         self.active_ws_count = 0
         self.received_audio = False
+        self.splitter = Mp3FrameSplitter()
+        self.gate: Optional[SilenceGate] = SilenceGate(SILENCE_GATE_THRESHOLD_DB) if SILENCE_GATE else None
+        self.silent_frame: Optional[bytes] = None
+        self.silent_frame_seconds = 0.0
+        self.silence_debt = 0.0
+        self.clip_lock = asyncio.Lock()
+        self.clip_idle = asyncio.Event()
+        self.clip_idle.set()
+
+    def set_silent_frame(self, frame: Optional[bytes]) -> None:
+        info = mp3_frame_info(frame or b"")
+        if frame is None or info is None:
+            self.silent_frame = None
+            return
+        self.silent_frame = frame
+        self.silent_frame_seconds = info[1]
 
     async def start(self) -> None:
         async with self.state_lock:
@@ -108,6 +897,11 @@ class AudioEngine:
 
             self.recent_buffer.clear()
             self.received_audio = False
+            self.stream_token = secrets.token_urlsafe(12)
+            self.splitter = Mp3FrameSplitter()
+            self.silence_debt = 0.0
+            if self.gate:
+                self.gate.reset()
 
             self.proc = await asyncio.create_subprocess_exec(
                 "ffmpeg",
@@ -128,15 +922,7 @@ class AudioEngine:
                 "1",
                 "-i",
                 "pipe:0",
-                "-vn",
-                "-ac",
-                "1",
-                "-ar",
-                "24000",
-                "-b:a",
-                "48k",
-                "-f",
-                "mp3",
+                *MP3_ENCODER_ARGS,
                 "pipe:1",
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
@@ -145,12 +931,13 @@ class AudioEngine:
 
             self.broadcast_task = asyncio.create_task(self._stdout_pump())
             self.stderr_task = asyncio.create_task(self._stderr_pump())
-            print("Audio engine started")
+            log_event(logging.INFO, "audio_engine_started", pid=self.proc.pid)
 
     async def stop(self) -> None:
         async with self.state_lock:
             proc = self.proc
             self.proc = None
+            self.stream_token = None
             broadcast_task = self.broadcast_task
             stderr_task = self.stderr_task
             self.broadcast_task = None
@@ -177,24 +964,35 @@ class AudioEngine:
                     await task
 
         self.recent_buffer.clear()
-        print("Audio engine stopped")
+        log_event(logging.INFO, "audio_engine_stopped")
 
     async def write(self, data: bytes) -> None:
+        if not self.clip_idle.is_set():
+            await self.clip_idle.wait()
+
         proc = self.proc
         if not proc or proc.returncode is not None or not proc.stdin:
             raise RuntimeError("ffmpeg is not running")
 
         if data:
             self.received_audio = True
+            if self.gate and self.silent_frame and not self.gate.is_speech(pcm_samples(data)):
+                await self._emit_silence(len(data) / 2 / PCM_SAMPLE_RATE)
+                return
 
         async with self.stdin_lock:
             proc.stdin.write(data)
             await proc.stdin.drain()
 
-    async def add_listener(self) -> asyncio.Queue[bytes]:
-        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=128)
+    def listener_count(self, host: str) -> int:
+        return sum(1 for listener_host in self.listener_hosts.values() if listener_host == host)
+
+    async def add_listener(self, host: str) -> asyncio.Queue[bytes]:
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=RECENT_BUFFER_CHUNKS + 128)
         async with self.listeners_lock:
             self.listeners.add(queue)
+            self.listener_hosts[queue] = host
+            self.listener_lags[queue] = sum(len(chunk) for chunk in self.recent_buffer) / MP3_BYTES_PER_SECOND
             for chunk in self.recent_buffer:
                 with suppress(asyncio.QueueFull):
                     queue.put_nowait(chunk)
@@ -203,6 +1001,46 @@ class AudioEngine:
     async def remove_listener(self, queue: asyncio.Queue[bytes]) -> None:
         async with self.listeners_lock:
             self.listeners.discard(queue)
+            self.listener_hosts.pop(queue, None)
+            self.listener_lags.pop(queue, None)
+
+    def drain_seconds(self) -> float:
+        # Late joiners replay the backlog and stay behind live by that much, so
+        # the last of the audio only reaches them this long after it was published.
+        lag = max(self.listener_lags.values(), default=0.0)
+        return max(0.0, lag - (time.monotonic() - self.last_publish_at))
+
+    async def play_clip(self, clip: "EncodedClip") -> None:
+        async with self.clip_lock:
+            self.clip_idle.clear()
+            try:
+                started = time.monotonic()
+                published = 0.0
+                for index in range(0, len(clip.frames), 10):
+                    frames = clip.frames[index:index + 10]
+                    await self._publish(b"".join(frames))
+                    published += len(frames) * clip.frame_seconds
+                    delay = started + published - CLIP_LEAD_SECONDS - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await asyncio.sleep(max(0.0, started + published - CLIP_LEAD_SECONDS - time.monotonic()))
+            finally:
+                self.clip_idle.set()
+
+    async def _emit_silence(self, seconds: float) -> None:
+        self.silence_debt += seconds
+        count = int(self.silence_debt / self.silent_frame_seconds)
+        if count <= 0:
+            return
+        self.silence_debt -= count * self.silent_frame_seconds
+        if self.gate:
+            self.gate.gated_frames += count
+        await self._publish(self.silent_frame * count)
+
+    async def _publish(self, chunk: bytes) -> None:
+        self.recent_buffer.append(chunk)
+        self.last_publish_at = time.monotonic()
+        await self._broadcast_chunk(chunk)
 
     async def _broadcast_chunk(self, chunk: bytes) -> None:
         dead: list[asyncio.Queue[bytes]] = []
@@ -214,6 +1052,12 @@ class AudioEngine:
                     dead.append(queue)
             for queue in dead:
                 self.listeners.discard(queue)
+                self.listener_hosts.pop(queue, None)
+                self.listener_lags.pop(queue, None)
+                # Wake the listener up so it ends the stream instead of waiting forever.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(b"")
 
     async def _stdout_pump(self) -> None:
         proc = self.proc
@@ -225,14 +1069,15 @@ class AudioEngine:
                 chunk = await proc.stdout.read(1024)
                 if not chunk:
                     break
-                self.recent_buffer.append(chunk)
-                await self._broadcast_chunk(chunk)
+                frames = self.splitter.feed(chunk)
+                if frames:
+                    await self._publish(b"".join(frames))
         except asyncio.CancelledError:
             raise
         except Exception as exc:
-            print("FFMPEG stdout pump failed:", exc)
+            log_event(logging.ERROR, "ffmpeg_stdout_failed", error=str(exc))
         finally:
-            print("FFMPEG stdout pump exited")
+            log_event(logging.DEBUG, "ffmpeg_stdout_exited")
 
     async def _stderr_pump(self) -> None:
         proc = self.proc
@@ -244,23 +1089,749 @@ class AudioEngine:
                 line = await proc.stderr.readline()
                 if not line:
                     break
-                print("FFMPEG:", line.decode(errors="ignore").rstrip())
+                log_sampled("ffmpeg_stderr", 5.0, logging.WARNING, "ffmpeg", line=line.decode(errors="ignore").rstrip())
         except asyncio.CancelledError:
             raise
         except Exception as exc:
-            print("FFMPEG stderr pump failed:", exc)
+            log_event(logging.ERROR, "ffmpeg_stderr_failed", error=str(exc))
         finally:
-            print("FFMPEG stderr pump exited")
+            log_event(logging.DEBUG, "ffmpeg_stderr_exited")
 
     def is_running(self) -> bool:
         return bool(self.proc and self.proc.returncode is None)
 
 
+def percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class ReadinessHistory:
+    def __init__(self, path: str, max_samples: int = READINESS_HISTORY_SAMPLES) -> None:
+        self.path = path
+        self.max_samples = max_samples
+        self.samples: dict[str, list[float]] = {}
+        self.save_lock = asyncio.Lock()
+        self.loaded_mtime: Optional[int] = None
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                self.loaded_mtime = os.fstat(handle.fileno()).st_mtime_ns
+                raw = json.load(handle)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as exc:
+            log_event(logging.WARNING, "readiness_history_load_failed", error=str(exc))
+            return
+
+        if not isinstance(raw, dict):
+            return
+        samples = {}
+        for entity_id, values in raw.items():
+            if not isinstance(values, list):
+                continue
+            cleaned = [float(v) for v in values if isinstance(v, (int, float)) and v >= 0]
+            if cleaned:
+                samples[str(entity_id)] = cleaned[-self.max_samples:]
+        self.samples = samples
+
+    def refresh(self) -> None:
+        # Workers that are not the owner only read what the owner saves, so
+        # they reload the file whenever it has changed.
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self.loaded_mtime:
+            self.load()
+
+    def record(self, entity_id: str, seconds: float) -> None:
+        history = self.samples.setdefault(entity_id, [])
+        history.append(round(max(0.0, seconds), 3))
+        del history[:-self.max_samples]
+
+    def expected(self, entity_id: str) -> Optional[dict]:
+        history = self.samples.get(entity_id)
+        if not history:
+            return None
+        ordered = sorted(history)
+        return {
+            "p50": percentile(ordered, 0.5),
+            "p95": percentile(ordered, 0.95),
+            "samples": len(ordered),
+        }
+
+    def outlier_after(self, entity_id: str, timeout_seconds: float) -> float:
+        expected = self.expected(entity_id)
+        if expected is None:
+            return timeout_seconds
+        return min(timeout_seconds, expected["p95"] * READINESS_OUTLIER_FACTOR + READINESS_OUTLIER_GRACE)
+
+    async def save(self) -> None:
+        payload = json.dumps(self.samples, sort_keys=True)
+        async with self.save_lock:
+            try:
+                await asyncio.to_thread(self._write, payload)
+            except OSError as exc:
+                log_event(logging.WARNING, "readiness_history_save_failed", error=str(exc))
+
+    def _write(self, payload: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(payload)
+        os.replace(tmp_path, self.path)
+
+
+def pcm_samples(data: bytes) -> array:
+    samples = array("h")
+    samples.frombytes(data[: len(data) - len(data) % 2])
+    if sys.byteorder != "little":
+        samples.byteswap()
+    return samples
+
+
+def pcm_bytes(samples: array) -> bytes:
+    if sys.byteorder != "little":
+        samples = array("h", samples)
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def pcm_rms(samples: array) -> float:
+    if not samples:
+        return 0.0
+    if np is not None:
+        values = np.frombuffer(samples, dtype=np.int16).astype(np.float64)
+        return math.sqrt(float(np.dot(values, values)) / len(values))
+    return math.sqrt(sum(value * value for value in samples) / len(samples))
+
+
+def pcm_crossfade(previous: array, following: array) -> array:
+    count = len(previous)
+    if np is not None:
+        weights = np.arange(1, count + 1, dtype=np.float64) / (count + 1)
+        mixed = np.frombuffer(previous, dtype=np.int16) * (1.0 - weights)
+        mixed += np.frombuffer(following, dtype=np.int16) * weights
+        return array("h", mixed.astype(np.int16).tobytes())
+    weights = [(index + 1) / (count + 1) for index in range(count)]
+    return array("h", (int(a * (1.0 - w) + b * w) for a, b, w in zip(previous, following, weights)))
+
+
+class CatchUpShaper:
+    def __init__(self) -> None:
+        self.silence_kept = 0
+        self.speech_segments = 0
+        self.crossfade_next = False
+        self.tail = array("h")
+
+    def process(self, samples: array) -> array:
+        # The end of the previous window is held back so that a segment
+        # dropped at a window boundary still fades into the next one.
+        out, self.tail = self.tail, array("h")
+        keep_silence = int(PREROLL_KEEP_SILENCE_SECONDS * PCM_SAMPLE_RATE)
+        for offset in range(0, len(samples), PCM_SEGMENT_SAMPLES):
+            segment = samples[offset:offset + PCM_SEGMENT_SAMPLES]
+            if pcm_rms(segment) < PREROLL_SILENCE_RMS:
+                self.speech_segments = 0
+                if self.silence_kept >= keep_silence:
+                    self.crossfade_next = True
+                    continue
+                self.silence_kept += len(segment)
+            else:
+                self.silence_kept = 0
+                self.speech_segments += 1
+                if self.speech_segments % PREROLL_DROP_EVERY == 0:
+                    self.crossfade_next = True
+                    continue
+            self._append(out, segment)
+        held = min(PREROLL_CROSSFADE_SAMPLES, len(out))
+        self.tail = out[len(out) - held:]
+        del out[len(out) - held:]
+        return out
+
+    def flush(self) -> array:
+        tail, self.tail = self.tail, array("h")
+        return tail
+
+    def _append(self, out: array, segment: array) -> None:
+        fade = min(PREROLL_CROSSFADE_SAMPLES, len(out), len(segment))
+        if self.crossfade_next and fade:
+            start = len(out) - fade
+            out[start:] = pcm_crossfade(out[start:], segment[:fade])
+            out.extend(segment[fade:])
+        else:
+            out.extend(segment)
+        self.crossfade_next = False
+
+
+class PrerollBuffer:
+    def __init__(self, client_id: str) -> None:
+        self.client_id = client_id
+        self.samples = array("h")
+        self.live = False
+        self.dropped_seconds = 0.0
+        self.trimmed_seconds = 0.0
+        self.drain_task: Optional[asyncio.Task] = None
+
+    def append(self, data: bytes) -> None:
+        self.samples.extend(pcm_samples(data))
+        overflow = len(self.samples) - PREROLL_MAX_SECONDS * PCM_SAMPLE_RATE
+        if overflow > 0:
+            del self.samples[:overflow]
+            self.dropped_seconds += overflow / PCM_SAMPLE_RATE
+
+    def backlog_seconds(self) -> float:
+        return len(self.samples) / PCM_SAMPLE_RATE
+
+    def take(self, count: int) -> array:
+        taken = self.samples[:count]
+        del self.samples[:count]
+        # Samples are buffered unprocessed so that audio which is never
+        # played back costs no DSP time.
+        dsp = dsp_chains.get(self.client_id)
+        if dsp is not None and taken:
+            taken = pcm_samples(dsp.process(pcm_bytes(taken)))
+        return taken
+
+    def stats(self) -> dict:
+        return {
+            "live": self.live,
+            "backlog_seconds": round(self.backlog_seconds(), 2),
+            "trimmed_seconds": round(self.trimmed_seconds, 2),
+            "dropped_seconds": round(self.dropped_seconds, 2),
+        }
+
+    async def drain(self, audio_engine: "AudioEngine") -> None:
+        shaper = CatchUpShaper()
+        window = PCM_SAMPLE_RATE // 10
+        started = time.monotonic()
+        produced = 0.0
+        try:
+            while len(self.samples) > PCM_SEGMENT_SAMPLES:
+                taken = self.take(window)
+                shaped = shaper.process(taken)
+                self.trimmed_seconds += (len(taken) - len(shaped)) / PCM_SAMPLE_RATE
+                if not shaped:
+                    continue
+                await audio_engine.write(pcm_bytes(shaped))
+                produced += len(shaped) / PCM_SAMPLE_RATE
+                delay = started + produced - PREROLL_LEAD_SECONDS - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            tail = shaper.flush()
+            if tail:
+                self.trimmed_seconds -= len(tail) / PCM_SAMPLE_RATE
+                await audio_engine.write(pcm_bytes(tail))
+            while self.samples:
+                await audio_engine.write(pcm_bytes(self.take(len(self.samples))))
+            self.live = True
+            log_event(logging.INFO, "preroll_caught_up", client_id=self.client_id, trimmed_seconds=self.trimmed_seconds)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            log_event(logging.ERROR, "preroll_failed", client_id=self.client_id, error=str(exc))
+
+
+class EncodedClip:
+    def __init__(self, name: str, frames: list[bytes]) -> None:
+        self.name = name
+        self.frames = frames
+        info = mp3_frame_info(frames[0]) if frames else None
+        self.frame_seconds = info[1] if info else 0.0
+        self.size = sum(len(frame) for frame in frames)
+
+    @property
+    def duration(self) -> float:
+        return len(self.frames) * self.frame_seconds
+
+
+class ClipLibrary:
+    def __init__(self, clips_dir: str, cache_dir: str) -> None:
+        self.clips_dir = clips_dir
+        self.cache_dir = cache_dir
+        self.memory: "OrderedDict[str, EncodedClip]" = OrderedDict()
+        self.memory_bytes = 0
+        self.encode_locks: dict[str, asyncio.Lock] = {}
+
+    def resolve(self, name: str) -> str:
+        name = (name or "").strip()
+        extension = os.path.splitext(name)[1].lower()
+        if not name or name.startswith(".") or os.path.basename(name) != name or extension not in CLIP_EXTENSIONS:
+            raise HTTPException(status_code=400, detail=f"Invalid clip name: {name}")
+        return name
+
+    async def list_clips(self) -> list[dict]:
+        return await asyncio.to_thread(self._scan)
+
+    def _scan(self) -> list[dict]:
+        try:
+            entries = sorted(os.scandir(self.clips_dir), key=lambda entry: entry.name.lower())
+        except FileNotFoundError:
+            return []
+
+        clips = []
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() not in CLIP_EXTENSIONS or not entry.is_file():
+                continue
+            stat = entry.stat()
+            key = self._cache_key(entry.name, stat)
+            clips.append({
+                "name": entry.name,
+                "size": stat.st_size,
+                "cached": key in self.memory or os.path.exists(self._cache_path(key)),
+            })
+        return clips
+
+    def _cache_key(self, name: str, stat: os.stat_result) -> str:
+        raw = "\0".join([name, str(stat.st_size), str(stat.st_mtime_ns), " ".join(MP3_ENCODER_ARGS)])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    async def load(self, name: str) -> EncodedClip:
+        path = os.path.join(self.clips_dir, name)
+        key = self._cache_key(name, await asyncio.to_thread(os.stat, path))
+        return await self._load_cached(key, name, lambda: self._encode(path, name))
+
+    async def load_generated(self, name: str, source_key: str, fetch: Callable[[], Awaitable[bytes]]) -> EncodedClip:
+        raw = "\0".join([source_key, " ".join(MP3_ENCODER_ARGS)])
+        key = hashlib.sha1(raw.encode()).hexdigest()
+
+        async def encode() -> bytes:
+            return await self._encode("pipe:0", name, await fetch())
+
+        return await self._load_cached(key, name, encode)
+
+    async def _load_cached(self, key: str, name: str, encode: Callable[[], Awaitable[bytes]]) -> EncodedClip:
+        clip = self._from_memory(key)
+        if clip is not None:
+            return clip
+
+        lock = self.encode_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                clip = self._from_memory(key)
+                if clip is not None:
+                    return clip
+
+                data = await asyncio.to_thread(self._read_disk, key)
+                if data is None:
+                    data = await encode()
+                    with suppress(OSError):
+                        await asyncio.to_thread(self._write_disk, key, data)
+
+                frames = Mp3FrameSplitter().feed(data)
+                if not frames:
+                    raise RuntimeError(f"Clip {name} contains no audio")
+                clip = EncodedClip(name, frames)
+                self._remember(key, clip)
+                return clip
+        finally:
+            self.encode_locks.pop(key, None)
+
+    def _from_memory(self, key: str) -> Optional[EncodedClip]:
+        clip = self.memory.get(key)
+        if clip is not None:
+            self.memory.move_to_end(key)
+        return clip
+
+    def _remember(self, key: str, clip: EncodedClip) -> None:
+        self.memory[key] = clip
+        self.memory_bytes += clip.size
+        while self.memory_bytes > CLIP_MEMORY_CACHE_BYTES and len(self.memory) > 1:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= evicted.size
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._cache_path(key)
+        try:
+            with open(path, "rb") as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            return None
+        with suppress(OSError):
+            os.utime(path)
+        return data
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+
+        cached = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".mp3") and entry.is_file():
+                stat = entry.stat()
+                cached.append((stat.st_mtime, stat.st_size, entry.path))
+        cached.sort()
+        total = sum(size for _, size, _ in cached)
+        for _, size, cached_path in cached:
+            if total <= CLIP_DISK_CACHE_BYTES or cached_path == path:
+                break
+            with suppress(OSError):
+                os.remove(cached_path)
+                total -= size
+
+    async def _encode(self, source: str, name: str, data: Optional[bytes] = None) -> bytes:
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            source,
+            *MP3_ENCODER_ARGS,
+            "-write_xing",
+            "0",
+            "-id3v2_version",
+            "0",
+            "pipe:1",
+            stdin=asyncio.subprocess.PIPE if data is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate(data)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Could not encode {name}: {stderr.decode(errors='ignore').strip()[:300]}")
+        log_event(logging.INFO, "clip_encoded", clip=name, bytes=len(stdout))
+        return stdout
+
+
+class AnnouncementJob:
+    def __init__(
+        self,
+        kind: str,
+        targets: list[dict],
+        client_id: Optional[str],
+        volumes: dict[str, int],
+        priority: int = ANNOUNCEMENT_DEFAULT_PRIORITY,
+        start_at: Optional[float] = None,
+        clip: Optional[EncodedClip] = None,
+        chime: Optional[EncodedClip] = None,
+    ) -> None:
+        self.id = secrets.token_hex(6)
+        self.kind = kind
+        self.targets = targets
+        self.entity_ids = [t["entity_id"] for t in targets]
+        self.client_id = client_id
+        self.volumes = volumes
+        self.priority = priority
+        self.start_at = start_at
+        self.clip = clip
+        self.chime = chime
+        self.status = "queued"
+        self.created_at = time.time()
+        now = time.monotonic()
+        self.due_at = now + max(0.0, start_at - self.created_at) if start_at else now
+        self.sequence = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.wait_seconds: Optional[float] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.future: Optional[asyncio.Future] = None
+
+    def resolve(self, result: Optional[dict] = None, error: Optional[Exception] = None) -> None:
+        if error is not None:
+            self.error = getattr(error, "detail", None) or str(error)
+        if self.future is None or self.future.done():
+            return
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(result)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "target_ids": [t["id"] for t in self.targets],
+            "client_id": self.client_id,
+            "clip": self.clip.name if self.clip else None,
+            "duration": round(self.clip.duration, 2) if self.clip else None,
+            "created_at": self.created_at,
+            "start_at": self.start_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_seconds": None if self.wait_seconds is None else round(self.wait_seconds, 2),
+            "error": self.error,
+            "stream_url": self.result.get("stream_url") if self.result else None,
+        }
+
+
+class AnnouncementScheduler:
+    def __init__(self) -> None:
+        self.queue: list[AnnouncementJob] = []
+        self.current: Optional[AnnouncementJob] = None
+        self.recent: Deque[AnnouncementJob] = deque(maxlen=ANNOUNCEMENT_HISTORY)
+        self.waits: Deque[float] = deque(maxlen=200)
+        self.counts = {"started": 0, "completed": 0, "failed": 0, "preempted": 0, "cancelled": 0}
+        self.sequence = 0
+        self.wake = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.starting: Optional[AnnouncementJob] = None
+        self.start_task: Optional[asyncio.Task] = None
+
+    def submit(self, job: AnnouncementJob) -> None:
+        self.sequence += 1
+        job.sequence = self.sequence
+        job.status = "queued"
+        self.queue.append(job)
+        self.wake.set()
+
+    def order(self, job: AnnouncementJob) -> tuple[int, float, int]:
+        return (-job.priority, job.due_at, job.sequence)
+
+    def peek_due(self) -> Optional[AnnouncementJob]:
+        now = time.monotonic()
+        due = [job for job in self.queue if job.due_at <= now]
+        return min(due, key=self.order) if due else None
+
+    def seconds_until_next(self) -> Optional[float]:
+        now = time.monotonic()
+        upcoming = [job.due_at - now for job in self.queue if job.due_at > now]
+        return min(upcoming) if upcoming else None
+
+    def position(self, job: AnnouncementJob) -> int:
+        return sorted(self.queue, key=lambda queued: (queued.due_at > time.monotonic(), self.order(queued))).index(job) + 1
+
+    def get(self, job_id: str) -> Optional[AnnouncementJob]:
+        if self.current is not None and self.current.id == job_id:
+            return self.current
+        for job in [*self.queue, *self.recent]:
+            if job.id == job_id:
+                return job
+        return None
+
+    def take(self, job: AnnouncementJob) -> None:
+        self.queue.remove(job)
+
+    def start(self, job: AnnouncementJob) -> None:
+        job.status = "starting"
+        job.started_at = time.time()
+        job.wait_seconds = max(0.0, time.monotonic() - job.due_at)
+        self.waits.append(job.wait_seconds)
+        self.counts["started"] += 1
+        self.current = job
+
+    def requeue(self, job: AnnouncementJob) -> None:
+        if self.current is job:
+            self.current = None
+        job.started_at = None
+        job.result = None
+        self.queue.append(job)
+        job.status = "queued"
+        self.wake.set()
+
+    def finish(self, status: Optional[str] = None) -> None:
+        job = self.current
+        self.current = None
+        self.wake.set()
+        if job is None:
+            return
+        if status is None:
+            status = "completed" if job.status == "playing" else "failed"
+        if job.status in ("starting", "playing"):
+            job.status = status
+        job.finished_at = time.time()
+        self.counts[job.status] = self.counts.get(job.status, 0) + 1
+        self.recent.appendleft(job)
+
+    def reject(self, job: AnnouncementJob, error: HTTPException) -> None:
+        if job in self.queue:
+            self.queue.remove(job)
+        job.status = "failed"
+        job.finished_at = time.time()
+        job.resolve(error=error)
+        self.counts["failed"] += 1
+        self.recent.appendleft(job)
+        self.wake.set()
+
+    def cancel(self, job: AnnouncementJob) -> None:
+        self.queue.remove(job)
+        job.status = "cancelled"
+        job.finished_at = time.time()
+        job.resolve(error=HTTPException(status_code=409, detail="Announcement was cancelled"))
+        self.counts["cancelled"] += 1
+        self.recent.appendleft(job)
+        self.wake.set()
+
+    def stats(self) -> dict:
+        waits = sorted(self.waits)
+        return {
+            "queued": len(self.queue),
+            "current": self.current.id if self.current else None,
+            **self.counts,
+            "wait_p50_seconds": round(percentile(waits, 0.5), 2),
+            "wait_p95_seconds": round(percentile(waits, 0.95), 2),
+            "wait_max_seconds": round(waits[-1], 2) if waits else 0.0,
+        }
+
+    def snapshot(self) -> dict:
+        queued = sorted(self.queue, key=lambda job: (job.due_at > time.monotonic(), self.order(job)))
+        return {
+            "current": self.current.to_dict() if self.current else None,
+            "queue": [job.to_dict() for job in queued],
+            "recent": [job.to_dict() for job in self.recent],
+            "metrics": self.stats(),
+        }
+
+
+class LoopWatchdog:
+    def __init__(self) -> None:
+        self.heartbeat = time.monotonic()
+        self.lags: Deque[float] = deque(maxlen=WATCHDOG_SAMPLES)
+        self.lag_max = 0.0
+        self.tasks = 0
+        self.blocks = 0
+        self.last_block: Optional[dict] = None
+        self.loop_thread_id: Optional[int] = None
+        self.monitor_task: Optional[asyncio.Task] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    def start(self) -> None:
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.stopping.clear()
+        self.monitor_task = asyncio.create_task(self._monitor())
+        self.thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.thread.start()
+
+    async def stop(self) -> None:
+        self.stopping.set()
+        if self.monitor_task:
+            self.monitor_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.monitor_task
+        if self.thread:
+            await asyncio.to_thread(self.thread.join, 1.0)
+
+    async def _monitor(self) -> None:
+        ticks = 0
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(WATCHDOG_INTERVAL_SECONDS)
+            now = time.monotonic()
+            lag = max(0.0, now - started - WATCHDOG_INTERVAL_SECONDS)
+            self.heartbeat = now
+            self.lags.append(lag)
+            self.lag_max = max(self.lag_max, lag)
+            if lag >= WATCHDOG_BLOCK_SECONDS and self.last_block and self.last_block.get("blocked_ms") is None:
+                self.last_block["blocked_ms"] = round(lag * 1000, 1)
+            ticks += 1
+            if ticks % 10 == 0:
+                self.tasks = len(asyncio.all_tasks())
+
+    def _watch(self) -> None:
+        reported = None
+        while not self.stopping.wait(WATCHDOG_INTERVAL_SECONDS / 2):
+            heartbeat = self.heartbeat
+            late = time.monotonic() - heartbeat - WATCHDOG_INTERVAL_SECONDS
+            if late < WATCHDOG_BLOCK_SECONDS or reported == heartbeat:
+                continue
+            reported = heartbeat
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = [
+                f"{entry.filename}:{entry.lineno} in {entry.name}: {entry.line}"
+                for entry in traceback.extract_stack(frame)[-8:]
+            ] if frame else []
+            self.blocks += 1
+            self.last_block = {
+                "at": time.time(),
+                "late_ms": round(late * 1000, 1),
+                "blocked_ms": None,
+                "stack": stack,
+            }
+            log_event(logging.WARNING, "event_loop_blocked", late_ms=late * 1000, at=stack[-1] if stack else None)
+
+    def stats(self) -> dict:
+        lags = sorted(self.lags)
+        return {
+            "lag_ms": round(self.lags[-1] * 1000, 1) if self.lags else 0.0,
+            "lag_p95_ms": round(percentile(lags, 0.95) * 1000, 1),
+            "lag_max_ms": round(self.lag_max * 1000, 1),
+            "block_threshold_ms": WATCHDOG_BLOCK_SECONDS * 1000,
+            "blocks": self.blocks,
+            "last_block": self.last_block,
+            "tasks": self.tasks,
+        }
+
+
+class GroupCache:
+    def __init__(self) -> None:
+        self.entity_ids: Optional[list[str]] = None
+        self.playing = False
+        self.snapshots: dict[str, dict] = {}
+        self.held_at: Optional[float] = None
+        self.release_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def matches(self, entity_ids: list[str]) -> bool:
+        return (
+            self.entity_ids is not None
+            and self.entity_ids[0] == entity_ids[0]
+            and set(self.entity_ids) == set(entity_ids)
+        )
+
+    def hold(self, entity_ids: list[str], playing: bool, snapshots: dict[str, dict]) -> None:
+        self.entity_ids = entity_ids
+        self.playing = playing
+        self.snapshots = snapshots
+        self.held_at = time.monotonic()
+
+    def clear(self) -> None:
+        self.entity_ids = None
+        self.playing = False
+        self.snapshots = {}
+        self.held_at = None
+
+    def stats(self) -> dict:
+        return {
+            "entity_ids": self.entity_ids,
+            "playing": self.playing,
+            "held_seconds": round(time.monotonic() - self.held_at, 1) if self.held_at else None,
+            "hold_seconds": GROUP_HOLD_SECONDS,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+        }
+
+
 engine = AudioEngine()
+clip_library = ClipLibrary(CLIPS_DIR, CLIP_CACHE_DIR)
+scheduler = AnnouncementScheduler()
+group_cache = GroupCache()
+watchdog = LoopWatchdog()
+worker = WorkerRole()
+network_identity = {
+    "lan_ip": None,
+    "checked_at": None,
+    "changed_at": None,
+    "error": None,
+}
+readiness_history = ReadinessHistory(READINESS_HISTORY_PATH)
 
 session_lock = asyncio.Lock()
 active_session = {
     "running": False,
+    "kind": None,
+    "session_id": None,
     "leader": None,
     "selected_ids": [],
     "selected_entity_ids": [],
@@ -270,8 +1841,20 @@ active_session = {
     "recorder_client_id": None,
     "recorder_claimed_at": None,
     "volumes": {},
+    "readiness": None,
+    "target_states": {},
+    "failed_entity_ids": [],
+    "job_id": None,
+    "priority": None,
+    "draining": False,
 }
 recorder_disconnect_task: Optional[asyncio.Task] = None
+late_targets_task: Optional[asyncio.Task] = None
+clip_session_task: Optional[asyncio.Task] = None
+# What each target was doing before the current announcement took it over.
+session_snapshots: dict[str, dict] = {}
+preroll_buffers: dict[str, PrerollBuffer] = {}
+dsp_chains: dict[str, DspChain] = {}
 
 
 # =========================
@@ -281,6 +1864,31 @@ class StartRequest(BaseModel):
     target_ids: list[str] = Field(default_factory=list)
     client_id: str = Field(min_length=1)
     volumes: dict[str, int] = Field(default_factory=dict)
+    chime: Optional[str] = None
+    priority: int = Field(default=ANNOUNCEMENT_DEFAULT_PRIORITY, ge=0, le=100)
+    queue: bool = False
+    start_at: Optional[datetime] = None
+
+
+class ClipPlayRequest(BaseModel):
+    clip: str = Field(min_length=1)
+    target_ids: list[str] = Field(default_factory=list)
+    client_id: str = Field(min_length=1)
+    volumes: dict[str, int] = Field(default_factory=dict)
+
+
+class AnnouncementRequest(BaseModel):
+    kind: str = "clip"
+    target_ids: list[str] = Field(default_factory=list)
+    client_id: Optional[str] = None
+    volumes: dict[str, int] = Field(default_factory=dict)
+    priority: int = Field(default=ANNOUNCEMENT_DEFAULT_PRIORITY, ge=0, le=100)
+    start_at: Optional[datetime] = None
+    clip: Optional[str] = None
+    chime: Optional[str] = None
+    message: Optional[str] = None
+    tts_engine: Optional[str] = None
+    language: Optional[str] = None
 
 
 class VolumeUpdateRequest(BaseModel):
@@ -346,8 +1954,9 @@ async def ha_get(path: str):
     ensure_ha_token()
     url = f"{HA_BASE_URL}{path}"
     client = get_ha_client()
+    started = time.monotonic()
     resp = await client.get(url, headers=build_headers())
-    print("HA GET", url, "->", resp.status_code)
+    log_event(TRACE, "ha_get", path=path, status=resp.status_code, ms=(time.monotonic() - started) * 1000)
     resp.raise_for_status()
     return resp.json()
 
@@ -356,8 +1965,13 @@ async def ha_post(service: str, data: dict):
     ensure_ha_token()
     url = f"{HA_BASE_URL}/api/services/{service}"
     client = get_ha_client()
+    started = time.monotonic()
     resp = await client.post(url, headers=build_headers(), json=data)
-    print("HA POST", url, data, "->", resp.status_code, resp.text[:300])
+    elapsed_ms = (time.monotonic() - started) * 1000
+    if resp.is_error:
+        log_event(logging.WARNING, "ha_post", service=service, status=resp.status_code, ms=elapsed_ms, data=data, body=resp.text[:300])
+    else:
+        log_event(logging.DEBUG, "ha_post", service=service, status=resp.status_code, ms=elapsed_ms, data=data)
     resp.raise_for_status()
     return resp.json()
 
@@ -366,7 +1980,46 @@ async def get_state(entity_id: str) -> dict:
     return await ha_get(f"/api/states/{entity_id}")
 
 
-def get_lan_ip() -> str:
+async def load_clip(name: str) -> "EncodedClip":
+    name = clip_library.resolve(name)
+    try:
+        return await clip_library.load(name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Clip not found: {name}")
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+async def load_tts_clip(engine_id: str, message: str, language: Optional[str] = None) -> "EncodedClip":
+    async def fetch() -> bytes:
+        ensure_ha_token()
+        client = get_ha_client()
+        body = {"engine_id": engine_id, "message": message}
+        if language:
+            body["language"] = language
+        resp = await client.post(f"{HA_BASE_URL}/api/tts_get_url", headers=build_headers(), json=body)
+        log_event(logging.DEBUG, "ha_tts", engine=engine_id, status=resp.status_code)
+        resp.raise_for_status()
+        audio = await client.get(f"{HA_BASE_URL}{resp.json()['path']}", headers=build_headers())
+        audio.raise_for_status()
+        return audio.content
+
+    source_key = "\0".join(["tts", engine_id, language or "", message])
+    try:
+        return await clip_library.load_generated(f"TTS: {message[:40]}", source_key, fetch)
+    except (httpx.HTTPError, KeyError) as exc:
+        raise HTTPException(status_code=502, detail=f"Home Assistant TTS failed: {exc}")
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+def start_time(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    return value.timestamp()
+
+
+def detect_lan_ip() -> str:
     if APP_BASE_URL.startswith(("http://", "https://")):
         try:
             host = APP_BASE_URL.split("://", 1)[1].split("/", 1)[0].split(":", 1)[0]
@@ -383,8 +2036,45 @@ def get_lan_ip() -> str:
         sock.close()
 
 
+async def refresh_lan_ip() -> Optional[str]:
+    try:
+        lan_ip = await asyncio.to_thread(detect_lan_ip)
+    except OSError as exc:
+        network_identity["error"] = str(exc)
+        log_sampled("lan_ip", 600.0, logging.WARNING, "lan_ip_failed", error=str(exc))
+        return network_identity["lan_ip"]
+
+    network_identity["checked_at"] = time.time()
+    network_identity["error"] = None
+    if lan_ip != network_identity["lan_ip"]:
+        log_event(logging.INFO, "lan_ip_changed", lan_ip=lan_ip, previous=network_identity["lan_ip"])
+        network_identity["lan_ip"] = lan_ip
+        network_identity["changed_at"] = time.time()
+    return lan_ip
+
+
+async def refresh_lan_ip_periodically() -> None:
+    while True:
+        await asyncio.sleep(LAN_IP_REFRESH_SECONDS)
+        await refresh_lan_ip()
+
+
 def stream_url() -> str:
-    return f"{APP_BASE_URL}/live.mp3"
+    url = f"{APP_BASE_URL}/live.mp3"
+    return f"{url}?token={engine.stream_token}" if engine.stream_token else url
+
+
+def is_stream_url(url: Optional[str]) -> bool:
+    return bool(url) and url.split("?", 1)[0] == f"{APP_BASE_URL}/live.mp3"
+
+
+def stream_state(state_obj: dict) -> str:
+    # A target still playing whatever it played before the announcement is
+    # not ready yet; only our stream counts.
+    state = state_obj.get("state", "unknown")
+    if state in READY_STATES and not is_stream_url((state_obj.get("attributes") or {}).get("media_content_id")):
+        return "switching"
+    return state
 
 
 async def fetch_target_state(target: dict) -> dict:
@@ -396,12 +2086,14 @@ async def fetch_target_state(target: dict) -> dict:
         item["friendly_name"] = attrs.get("friendly_name", target["name"])
         item["available"] = state_obj.get("state") != "unavailable"
         item["volume"] = int(round(float(attrs.get("volume_level", 0.5)) * 100))
+        item["expected_ready"] = readiness_history.expected(target["entity_id"])
     except Exception as exc:
-        print("Target lookup failed for", target["entity_id"], exc)
+        log_sampled(f"target_lookup:{target['entity_id']}", 60.0, logging.WARNING, "target_lookup_failed", entity_id=target["entity_id"], error=str(exc))
         item["ha_state"] = "unknown"
         item["friendly_name"] = target["name"]
         item["available"] = False
         item["volume"] = 50
+        item["expected_ready"] = readiness_history.expected(target["entity_id"])
     return item
 
 
@@ -503,30 +2195,363 @@ async def stop_targets(entity_ids: list[str]) -> None:
         await ha_post("media_player/unjoin", {"entity_id": leader})
 
 
-async def wait_until_targets_ready(targets: list[dict], timeout_seconds: float = 15.0) -> tuple[bool, dict[str, str]]:
+def snapshot_from_state(state: dict) -> dict:
+    attributes = state.get("attributes", {})
+    return {
+        "state": state.get("state", "unknown"),
+        "volume_level": attributes.get("volume_level"),
+        "source": attributes.get("source"),
+        "media_content_id": attributes.get("media_content_id"),
+        "media_content_type": attributes.get("media_content_type"),
+        "group_members": attributes.get("group_members") or [],
+    }
+
+
+async def snapshot_targets(entity_ids: list[str]) -> dict[str, dict]:
+    results = await asyncio.gather(*(get_state(entity_id) for entity_id in entity_ids), return_exceptions=True)
+    snapshots = {}
+    for entity_id, result in zip(entity_ids, results):
+        if isinstance(result, Exception):
+            log_event(logging.WARNING, "snapshot_failed", entity_id=entity_id, error=str(result))
+            continue
+        snapshots[entity_id] = snapshot_from_state(result)
+    return snapshots
+
+
+async def restore_target(entity_id: str, snapshot: dict) -> None:
+    if snapshot["volume_level"] is not None:
+        await ha_post(
+            "media_player/volume_set",
+            {"entity_id": entity_id, "volume_level": snapshot["volume_level"]},
+        )
+
+    members = snapshot["group_members"]
+    if snapshot["state"] != "playing" or (len(members) > 1 and members[0] != entity_id):
+        return
+
+    media_content_id = snapshot["media_content_id"]
+    if media_content_id and not is_stream_url(media_content_id):
+        await ha_post(
+            "media_player/play_media",
+            {
+                "entity_id": entity_id,
+                "media_content_id": media_content_id,
+                "media_content_type": snapshot["media_content_type"] or "music",
+            },
+        )
+    elif snapshot["source"]:
+        await ha_post("media_player/select_source", {"entity_id": entity_id, "source": snapshot["source"]})
+
+
+async def restore_targets(snapshots: dict[str, dict]) -> None:
+    if not snapshots:
+        return
+
+    groups: dict[str, set[str]] = {}
+    for entity_id, snapshot in snapshots.items():
+        members = snapshot["group_members"]
+        if len(members) > 1:
+            groups.setdefault(members[0], set()).update(member for member in members[1:] if member != members[0])
+
+    results = await asyncio.gather(
+        *(join_targets_if_needed(leader, sorted(members)) for leader, members in groups.items()),
+        return_exceptions=True,
+    )
+    results += await asyncio.gather(
+        *(restore_target(entity_id, snapshot) for entity_id, snapshot in snapshots.items()),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            log_event(logging.WARNING, "restore_failed", error=str(result))
+    log_event(logging.INFO, "state_restored", entity_ids=sorted(snapshots))
+
+
+def take_session_snapshots() -> dict[str, dict]:
+    snapshots = dict(session_snapshots)
+    session_snapshots.clear()
+    return snapshots
+
+
+async def stop_and_restore_targets(entity_ids: list[str], snapshots: Optional[dict[str, dict]] = None) -> None:
+    if snapshots is None:
+        snapshots = take_session_snapshots()
+    await stop_targets(entity_ids)
+    await restore_targets(snapshots)
+
+
+def readiness_quorum_count(total: int, quorum: float) -> int:
+    return max(1, min(total, math.ceil(total * quorum - 1e-9)))
+
+
+def readiness_eta(entity_ids: list[str], required: int, timeout_seconds: float) -> float:
+    estimates = []
+    for entity_id in entity_ids:
+        expected = readiness_history.expected(entity_id)
+        estimates.append(expected["p50"] if expected else timeout_seconds)
+    estimates.sort()
+    return estimates[required - 1]
+
+
+async def wait_until_targets_ready(
+    targets: list[dict],
+    timeout_seconds: float | None = None,
+    quorum: float | None = None,
+    started_at: float | None = None,
+    required: int | None = None,
+) -> tuple[bool, dict[str, str]]:
     if not targets:
         return False, {}
 
-    pending = {target["entity_id"] for target in targets}
-    states = {target["entity_id"]: "unknown" for target in targets}
-    deadline = time.monotonic() + timeout_seconds
+    if timeout_seconds is None:
+        timeout_seconds = READINESS_TIMEOUT
+    if quorum is None:
+        quorum = READINESS_QUORUM
+    if started_at is None:
+        started_at = time.monotonic()
+
+    entity_ids = [target["entity_id"] for target in targets]
+    pending = set(entity_ids)
+    states = {entity_id: "unknown" for entity_id in entity_ids}
+    wait_for_outliers = required is None
+    if required is None:
+        required = readiness_quorum_count(len(entity_ids), quorum)
+    required = max(1, min(len(entity_ids), required))
+    outlier_after = {
+        entity_id: readiness_history.outlier_after(entity_id, timeout_seconds)
+        for entity_id in entity_ids
+    }
+    eta = readiness_eta(entity_ids, required, timeout_seconds)
+    deadline = started_at + timeout_seconds
+    recorded = False
 
-    while time.monotonic() < deadline:
-        for entity_id in list(pending):
-            try:
-                state_obj = await get_state(entity_id)
-                state = state_obj.get("state", "unknown")
+    try:
+        while time.monotonic() < deadline:
+            polled = sorted(pending)
+            results = await asyncio.gather(*(get_state(entity_id) for entity_id in polled), return_exceptions=True)
+            now = time.monotonic()
+            elapsed = now - started_at
+            for entity_id, result in zip(polled, results):
+                if isinstance(result, Exception):
+                    log_sampled(f"state_poll:{entity_id}", 5.0, logging.WARNING, "state_poll_failed", entity_id=entity_id, error=str(result))
+                    continue
+                state = stream_state(result)
+                log_event(
+                    logging.DEBUG if state != states[entity_id] else TRACE,
+                    "target_state",
+                    entity_id=entity_id,
+                    state=state,
+                    elapsed=elapsed,
+                )
                 states[entity_id] = state
-                print("Target state:", entity_id, state)
-                if state in {"buffering", "playing"}:
+                if state in READY_STATES:
                     pending.discard(entity_id)
-            except Exception as exc:
-                print("State poll failed:", entity_id, exc)
-        if not pending:
-            return True, states
-        await asyncio.sleep(0.5)
+                    readiness_history.record(entity_id, elapsed)
+                    recorded = True
+
+            ready_count = len(entity_ids) - len(pending)
+            active_session["readiness"] = {
+                "required": required,
+                "ready": ready_count,
+                "total": len(entity_ids),
+                "eta_seconds": round(max(0.0, eta - elapsed), 1),
+                "pending_entity_ids": sorted(pending),
+            }
+            if not pending:
+                return True, states
+            if ready_count >= required and not wait_for_outliers:
+                return True, states
+            if ready_count >= required and all(elapsed >= outlier_after[entity_id] for entity_id in pending):
+                log_event(logging.INFO, "skipping_slow_targets", entity_ids=sorted(pending), elapsed=elapsed)
+                return True, states
+            await asyncio.sleep(0.5)
+
+        return False, states
+    finally:
+        if recorded:
+            await readiness_history.save()
+
+
+async def follow_late_targets(targets: list[dict], started_at: float, ready_message: str) -> None:
+    pending_ids = [target["entity_id"] for target in targets]
+    try:
+        if time.monotonic() < started_at + READINESS_TIMEOUT:
+            _, states = await wait_until_targets_ready(targets, quorum=1.0, started_at=started_at)
+        else:
+            states = {}
+        if not active_session["running"]:
+            return
+        active_session["target_states"].update({entity_id: states.get(entity_id, "unknown") for entity_id in pending_ids})
+        failed = [entity_id for entity_id in pending_ids if states.get(entity_id) not in READY_STATES]
+        active_session["failed_entity_ids"] = failed
+        if failed:
+            log_event(logging.WARNING, "targets_not_ready", entity_ids=failed)
+            await set_session_status(f"{ready_message} ({len(failed)} target(s) failed)")
+        else:
+            await set_session_status(ready_message)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        log_event(logging.ERROR, "late_target_tracking_failed", error=str(exc))
+
+
+def start_preroll_playback(client_id: str) -> None:
+    buffer = preroll_buffers.get(client_id)
+    if buffer is None or buffer.drain_task is not None:
+        return
+    log_event(logging.INFO, "preroll_playback", client_id=client_id, backlog_seconds=buffer.backlog_seconds())
+    buffer.drain_task = asyncio.create_task(buffer.drain(engine))
+
 
-    return False, states
+async def discard_preroll_buffers() -> None:
+    buffers = list(preroll_buffers.values())
+    preroll_buffers.clear()
+    for buffer in buffers:
+        if buffer.drain_task:
+            buffer.drain_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await buffer.drain_task
+
+
+def claim_session(targets: list[dict], client_id: Optional[str], kind: str) -> None:
+    entity_ids = [t["entity_id"] for t in targets]
+    active_session.update(
+        {
+            "running": True,
+            "kind": kind,
+            "session_id": secrets.token_hex(8),
+            "leader": entity_ids[0],
+            "selected_ids": [t["id"] for t in targets],
+            "selected_entity_ids": entity_ids,
+            "started_at": time.time(),
+            "recorder_client_id": client_id,
+            "recorder_claimed_at": time.time(),
+        }
+    )
+
+
+async def reused_group_states(targets: list[dict]) -> tuple[bool, dict[str, str]]:
+    entity_ids = [t["entity_id"] for t in targets]
+    results = await asyncio.gather(*(get_state(entity_id) for entity_id in entity_ids), return_exceptions=True)
+    states = {
+        entity_id: "unknown" if isinstance(result, Exception) else stream_state(result)
+        for entity_id, result in zip(entity_ids, results)
+    }
+    ok = all(state in READY_STATES for state in states.values())
+    if ok:
+        active_session["readiness"] = {
+            "required": len(entity_ids),
+            "ready": len(entity_ids),
+            "total": len(entity_ids),
+            "eta_seconds": 0.0,
+            "pending_entity_ids": [],
+        }
+    return ok, states
+
+
+async def start_session_playback(
+    targets: list[dict],
+    volumes: dict[str, int],
+    ready_message: str,
+    held_group: Optional[str] = None,
+    snapshot_task: Optional[asyncio.Task] = None,
+) -> dict:
+    global late_targets_task
+
+    entity_ids = [t["entity_id"] for t in targets]
+    leader = entity_ids[0]
+    members = entity_ids[1:]
+    target_kind = targets[0].get("kind", "speaker")
+    await set_session_status("Grouping speakers…", ready=False)
+
+    try:
+        if snapshot_task:
+            session_snapshots.update(await snapshot_task)
+        if target_kind == "speaker" and held_group is None:
+            await join_targets_if_needed(leader, members)
+
+        await apply_volumes(targets, volumes)
+        await set_session_status("Starting playback…", ready=False)
+        play_started_at = time.monotonic()
+        ok, states = await reused_group_states(targets) if held_group == "playing" else (False, {})
+        if not ok:
+            await play_stream_on_targets(targets)
+            ok, states = await wait_until_targets_ready(
+                targets,
+                started_at=play_started_at,
+                required=PARTIAL_READY_TARGETS or None,
+            )
+        ready_ids = [entity_id for entity_id in entity_ids if states.get(entity_id) in READY_STATES]
+        if not ok and PARTIAL_READY_TARGETS and ready_ids:
+            ok = True
+
+        if ok:
+            late_targets = [t for t in targets if t["entity_id"] not in ready_ids]
+            active_session["target_states"] = dict(states)
+            active_session["failed_entity_ids"] = []
+            if late_targets:
+                message = f"{ready_message} ({len(ready_ids)} of {len(entity_ids)} targets ready)"
+                late_targets_task = asyncio.create_task(
+                    follow_late_targets(late_targets, play_started_at, ready_message)
+                )
+            else:
+                message = ready_message
+            await set_session_status(message, ready=True)
+            return {
+                "ok": True,
+                "leader": leader,
+                "state": states.get(leader, "unknown"),
+                "states": states,
+                "ready_entity_ids": ready_ids,
+                "pending_entity_ids": [t["entity_id"] for t in late_targets],
+                "message": message,
+                "stream_url": stream_url(),
+                "volumes": active_session["volumes"],
+                "readiness": active_session["readiness"],
+            }
+
+        await stop_and_restore_targets(entity_ids)
+        await reset_session(stop_audio_engine=True)
+        return {
+            "ok": False,
+            "leader": leader,
+            "state": states.get(leader, "unknown"),
+            "states": states,
+            "message": "Playback did not become ready in time",
+            "stream_url": stream_url(),
+        }
+    except httpx.HTTPStatusError as exc:
+        detail = exc.response.text[:500]
+        await set_session_status(f"Home Assistant error: {detail}", ready=False)
+        if snapshot_task and not snapshot_task.done():
+            snapshot_task.cancel()
+        await stop_and_restore_targets(entity_ids)
+        await reset_session(stop_audio_engine=True)
+        raise HTTPException(status_code=502, detail=f"Home Assistant error: {detail}")
+    except Exception as exc:
+        await set_session_status(f"Start failed: {exc}", ready=False)
+        if snapshot_task and not snapshot_task.done():
+            snapshot_task.cancel()
+        await stop_and_restore_targets(entity_ids)
+        await reset_session(stop_audio_engine=True)
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+async def finish_clip_session(session_id: str, clip: "EncodedClip") -> None:
+    global clip_session_task
+    try:
+        await engine.play_clip(clip)
+        await asyncio.sleep(CLIP_TAIL_SECONDS)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        log_event(logging.ERROR, "clip_playback_failed", clip=clip.name, error=str(exc))
+
+    async with session_lock:
+        if active_session.get("session_id") != session_id:
+            return
+        clip_session_task = None
+        await end_session()
 
 
 async def stop_if_recorder_does_not_return(client_id: str, delay: float = 5.0) -> None:
@@ -537,24 +2562,328 @@ async def stop_if_recorder_does_not_return(client_id: str, delay: float = 5.0) -
             and active_session.get("recorder_client_id") == client_id
             and engine.active_ws_count == 0
         ):
-            print("Recorder did not reconnect in time; stopping active session")
-            entity_ids = list(active_session["selected_entity_ids"])
-            with suppress(Exception):
-                await stop_targets(entity_ids)
-            await reset_session(stop_audio_engine=True)
+            log_event(logging.INFO, "recorder_timeout", client_id=client_id)
+            await end_session()
+
+
+async def end_session(next_entity_ids: Optional[list[str]] = None, drain: bool = True) -> None:
+    entity_ids = list(active_session["selected_entity_ids"])
+    if next_entity_ids is None:
+        next_job = scheduler.peek_due()
+        next_entity_ids = next_job.entity_ids if next_job else None
+
+    keep_playing = bool(entity_ids) and next_entity_ids == entity_ids
+    if drain and not keep_playing:
+        await drain_listeners()
+    if keep_playing or (GROUP_HOLD_SECONDS > 0 and len(entity_ids) > 1):
+        snapshots = take_session_snapshots()
+        await reset_session(stop_audio_engine=not keep_playing)
+        if keep_playing:
+            engine.recent_buffer.clear()
+        await hold_group(entity_ids, keep_playing, snapshots)
+        return
+
+    await stop_and_restore_targets(entity_ids)
+    await reset_session(stop_audio_engine=True)
+
+
+async def drain_listeners() -> None:
+    seconds = engine.drain_seconds()
+    if seconds <= 0.1:
+        return
+    log_event(logging.INFO, "draining_listeners", seconds=round(seconds, 2))
+    active_session["draining"] = True
+    await asyncio.sleep(seconds)
+
+
+async def hold_group(entity_ids: list[str], playing: bool, snapshots: dict[str, dict]) -> None:
+    if group_cache.entity_ids and not group_cache.matches(entity_ids):
+        await release_held_group()
+    if group_cache.release_task:
+        group_cache.release_task.cancel()
+
+    log_event(logging.INFO, "group_held", entity_ids=entity_ids, playing=playing)
+    group_cache.hold(entity_ids, playing, snapshots)
+    if not playing:
+        with suppress(Exception):
+            await ha_post("media_player/media_stop", {"entity_id": entity_ids[0]})
+    group_cache.release_task = asyncio.create_task(release_group_later(max(GROUP_HOLD_SECONDS, 1.0)))
+
+
+async def park_held_group() -> None:
+    if not group_cache.playing or active_session["running"]:
+        return
+    group_cache.playing = False
+    await engine.stop()
+    if len(group_cache.entity_ids) > 1 and GROUP_HOLD_SECONDS > 0:
+        with suppress(Exception):
+            await ha_post("media_player/media_stop", {"entity_id": group_cache.entity_ids[0]})
+    else:
+        await release_held_group()
+
+
+async def release_group_later(delay: float) -> None:
+    await asyncio.sleep(delay)
+    async with session_lock:
+        if group_cache.release_task is asyncio.current_task():
+            await release_held_group()
+
+
+async def release_held_group() -> None:
+    task = group_cache.release_task
+    group_cache.release_task = None
+    if task and task is not asyncio.current_task():
+        task.cancel()
+
+    entity_ids, playing, snapshots = group_cache.entity_ids, group_cache.playing, group_cache.snapshots
+    group_cache.clear()
+    if not entity_ids:
+        return
+    log_event(logging.INFO, "group_released", entity_ids=entity_ids)
+    await stop_and_restore_targets(entity_ids, snapshots)
+    if playing and not active_session["running"]:
+        await engine.stop()
+
+
+async def claim_held_group(entity_ids: list[str]) -> Optional[str]:
+    if group_cache.entity_ids is None:
+        return None
+    if not group_cache.matches(entity_ids):
+        group_cache.misses += 1
+        await release_held_group()
+        return None
+
+    if group_cache.release_task:
+        group_cache.release_task.cancel()
+        group_cache.release_task = None
+    held = "playing" if group_cache.playing else "joined"
+    session_snapshots.clear()
+    session_snapshots.update(group_cache.snapshots)
+    group_cache.clear()
+
+    if len(entity_ids) > 1:
+        try:
+            attributes = (await get_state(entity_ids[0])).get("attributes", {})
+        except Exception as exc:
+            log_event(logging.WARNING, "group_check_failed", error=str(exc))
+            attributes = {}
+        if set(attributes.get("group_members") or []) != set(entity_ids):
+            log_event(logging.INFO, "group_changed", expected=entity_ids, group_members=attributes.get("group_members"))
+            group_cache.stale += 1
+            return None
+
+    group_cache.hits += 1
+    return held
+
+
+def can_preempt(job: AnnouncementJob) -> bool:
+    current = active_session.get("priority")
+    return (
+        job.priority >= ANNOUNCEMENT_PREEMPT_PRIORITY
+        and current is not None
+        and job.priority > current
+    )
+
+
+async def preempt_session(job: AnnouncementJob) -> None:
+    current = scheduler.current
+    log_event(logging.INFO, "announcement_preempts", job_id=job.id, priority=job.priority, preempted=active_session.get("job_id"))
+    if current is not None and current.kind != "live":
+        scheduler.counts["preempted"] += 1
+        scheduler.requeue(current)
+    else:
+        scheduler.finish("preempted")
+        if current is not None:
+            current.resolve(error=HTTPException(status_code=409, detail="Preempted by a higher-priority announcement"))
+    await end_session(next_entity_ids=job.entity_ids, drain=False)
+
+
+async def run_announcement(job: AnnouncementJob) -> None:
+    global clip_session_task, recorder_disconnect_task
+
+    async with session_lock:
+        if active_session["running"]:
+            if not can_preempt(job):
+                # A caller waiting on the result was promised an immediate
+                # start, so it gets the same 409 as when it submitted.
+                if job.future is not None:
+                    scheduler.reject(job, HTTPException(status_code=409, detail=busy_detail()))
+                else:
+                    scheduler.submit(job)
+                return
+            await preempt_session(job)
+
+        session_snapshots.clear()
+        held_group = await claim_held_group(job.entity_ids)
+        # The snapshot must land before the join changes group membership, so
+        # it is overlapped with starting the encoder instead.
+        unsnapshotted = [entity_id for entity_id in job.entity_ids if entity_id not in session_snapshots]
+        snapshot_task = asyncio.create_task(snapshot_targets(unsnapshotted)) if RESTORE_STATE and unsnapshotted else None
+        await engine.start()
+        claim_session(job.targets, job.client_id, kind=job.kind)
+        active_session["job_id"] = job.id
+        active_session["priority"] = job.priority
+        scheduler.start(job)
+        ready_message = "You can speak now" if job.kind == "live" else f"Playing {job.clip.name}"
+        try:
+            result = await start_session_playback(
+                job.targets,
+                job.volumes,
+                ready_message,
+                held_group=held_group,
+                snapshot_task=snapshot_task,
+            )
+        except HTTPException as exc:
+            job.resolve(error=exc)
+            return
+
+        if not result["ok"]:
+            job.error = result["message"]
+            job.resolve(result)
+            return
+
+        result["job_id"] = job.id
+        job.result = result
+        job.status = "playing"
+        if job.kind == "live":
+            if job.chime:
+                status = active_session["status"]
+                await set_session_status("Playing chime…", ready=False)
+                try:
+                    await engine.play_clip(job.chime)
+                except Exception as exc:
+                    log_event(logging.ERROR, "chime_failed", error=str(exc))
+                await set_session_status(status, ready=True)
+            start_preroll_playback(job.client_id)
+            if job.future is None and recorder_disconnect_task is None:
+                recorder_disconnect_task = asyncio.create_task(
+                    stop_if_recorder_does_not_return(job.client_id, ANNOUNCEMENT_RECORDER_WAIT_SECONDS)
+                )
+        else:
+            result["clip"] = job.clip.name
+            result["duration"] = round(job.clip.duration, 2)
+            clip_session_task = asyncio.create_task(finish_clip_session(active_session["session_id"], job.clip))
+        job.resolve(result)
+
+
+async def run_scheduled_announcement(job: AnnouncementJob) -> None:
+    try:
+        await run_announcement(job)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        log_event(logging.ERROR, "announcement_failed", job_id=job.id, error=str(exc))
+        job.resolve(error=HTTPException(status_code=500, detail=str(exc)))
+
+
+async def cancel_starting_announcement() -> None:
+    task = scheduler.start_task
+    if task is None or task.done():
+        return
+    log_event(logging.INFO, "announcement_start_cancelled", job_id=scheduler.starting.id if scheduler.starting else None)
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+async def run_announcement_scheduler() -> None:
+    try:
+        while True:
+            scheduler.wake.clear()
+            if active_session["running"]:
+                # Callers waiting on an immediate start are not left queued
+                # behind a session that started after they submitted.
+                for waiting in [job for job in scheduler.queue if job.future is not None and not can_preempt(job)]:
+                    scheduler.reject(waiting, HTTPException(status_code=409, detail=busy_detail()))
+            job = scheduler.peek_due()
+            starting = scheduler.start_task is not None and not scheduler.start_task.done()
+            if starting:
+                # A start holds session_lock through the readiness wait, so a
+                # job that may preempt it cancels the start instead of waiting
+                # it out. Only a start that has claimed its session is
+                # cancelled; the preempting job then ends that session.
+                if (
+                    job is not None
+                    and can_preempt(job)
+                    and scheduler.starting is not None
+                    and active_session.get("job_id") == scheduler.starting.id
+                ):
+                    await cancel_starting_announcement()
+                    continue
+            elif job is not None and (not active_session["running"] or can_preempt(job)):
+                scheduler.take(job)
+                scheduler.starting = job
+                scheduler.start_task = asyncio.create_task(run_scheduled_announcement(job))
+                scheduler.start_task.add_done_callback(lambda _: scheduler.wake.set())
+                continue
+
+            if not starting and job is None and group_cache.playing and not active_session["running"]:
+                async with session_lock:
+                    if scheduler.peek_due() is None:
+                        await park_held_group()
+                continue
+
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(scheduler.wake.wait(), scheduler.seconds_until_next())
+    finally:
+        await cancel_starting_announcement()
+
+
+def busy_detail() -> str:
+    if active_session.get("kind") == "live":
+        return "Another device is currently recording"
+    return "Another announcement is currently playing"
+
+
+async def submit_announcement(job: AnnouncementJob, queue: bool):
+    if job.start_at is not None:
+        queue = True
+
+    if not queue:
+        if active_session["running"] and not can_preempt(job):
+            raise HTTPException(status_code=409, detail=busy_detail())
+        ahead = scheduler.peek_due()
+        if ahead is not None and scheduler.order(ahead) < scheduler.order(job):
+            raise HTTPException(status_code=409, detail="Other announcements are queued")
+        job.future = asyncio.get_running_loop().create_future()
+
+    scheduler.submit(job)
+    if queue:
+        return JSONResponse(
+            status_code=202,
+            content={"ok": True, "queued": True, "position": scheduler.position(job), "job": job.to_dict()},
+        )
+
+    result = await job.future
+    if not result["ok"]:
+        return JSONResponse(status_code=504, content=result)
+    return result
 
 
 async def reset_session(stop_audio_engine: bool) -> None:
-    global recorder_disconnect_task
+    global recorder_disconnect_task, late_targets_task, clip_session_task
     if recorder_disconnect_task:
         recorder_disconnect_task.cancel()
         with suppress(asyncio.CancelledError):
             await recorder_disconnect_task
         recorder_disconnect_task = None
+    if late_targets_task:
+        late_targets_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await late_targets_task
+        late_targets_task = None
+    if clip_session_task and clip_session_task is not asyncio.current_task():
+        clip_session_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await clip_session_task
+    clip_session_task = None
+    await discard_preroll_buffers()
 
     active_session.update(
         {
             "running": False,
+            "kind": None,
+            "session_id": None,
             "leader": None,
             "selected_ids": [],
             "selected_entity_ids": [],
@@ -564,10 +2893,17 @@ async def reset_session(stop_audio_engine: bool) -> None:
             "recorder_client_id": None,
             "recorder_claimed_at": None,
             "volumes": {},
+            "readiness": None,
+            "target_states": {},
+            "failed_entity_ids": [],
+            "job_id": None,
+            "priority": None,
+            "draining": False,
         }
     )
     if stop_audio_engine:
         await engine.stop()
+    scheduler.finish()
 
 
 # =========================
@@ -580,16 +2916,36 @@ async def index():
 
 @app.get("/api/targets")
 async def api_targets():
+    if not worker.owner:
+        await asyncio.to_thread(readiness_history.refresh)
     return {"targets": await resolve_targets()}
 
 
 @app.get("/api/status")
 async def api_status():
+    if worker.owner:
+        return status_payload()
+    shared = await asyncio.to_thread(worker.read_state)
+    if shared is None:
+        raise HTTPException(status_code=503, detail="Encoder worker is not available")
+    return shared
+
+
+def status_payload() -> dict:
+    preroll = preroll_buffers.get(active_session.get("recorder_client_id") or "")
+    dsp = dsp_chains.get(active_session.get("recorder_client_id") or "")
     return {
         **active_session,
         "active_ws_count": engine.active_ws_count,
+        "listener_count": len(engine.listeners),
         "ffmpeg_running": engine.is_running(),
         "stream_url": stream_url(),
+        "speak_immediately": SPEAK_IMMEDIATELY,
+        "preroll": preroll.stats() if preroll else None,
+        "silence_gate": engine.gate.stats() if engine.gate else None,
+        "dsp": dsp.stats() if dsp else None,
+        "announcements": scheduler.stats(),
+        "group_cache": group_cache.stats(),
     }
 
 
@@ -620,77 +2976,100 @@ async def api_set_volumes(payload: VolumeUpdateRequest):
 @app.post("/api/start")
 async def api_start(payload: StartRequest):
     targets = validate_target_ids(payload.target_ids)
-    entity_ids = [t["entity_id"] for t in targets]
-    leader = entity_ids[0]
-    members = entity_ids[1:]
-    target_kind = targets[0].get("kind", "speaker")
+    chime = await load_clip(payload.chime) if payload.chime else None
+    job = AnnouncementJob(
+        "live",
+        targets,
+        payload.client_id,
+        payload.volumes,
+        priority=payload.priority,
+        start_at=start_time(payload.start_at),
+        chime=chime,
+    )
 
     async with session_lock:
-        if active_session["running"]:
-            stale_entity_ids = list(active_session["selected_entity_ids"])
-            stale = (engine.active_ws_count == 0) or (not engine.is_running())
-            if stale:
-                print("Recovering stale session before starting a new one")
-                await stop_targets(stale_entity_ids)
-                await reset_session(stop_audio_engine=True)
-            else:
-                raise HTTPException(status_code=409, detail="Another device is currently recording")
+        stale = active_session["running"] and active_session.get("kind") == "live" and (
+            (engine.active_ws_count == 0) or (not engine.is_running())
+        )
+        if stale and not payload.queue:
+            log_event(logging.INFO, "stale_session_recovered", session_id=active_session.get("session_id"))
+            await stop_and_restore_targets(list(active_session["selected_entity_ids"]))
+            await reset_session(stop_audio_engine=True)
 
-        await engine.start()
-        active_session["running"] = True
-        active_session["leader"] = leader
-        active_session["selected_ids"] = [t["id"] for t in targets]
-        active_session["selected_entity_ids"] = entity_ids
-        active_session["started_at"] = time.time()
-        active_session["recorder_client_id"] = payload.client_id
-        active_session["recorder_claimed_at"] = time.time()
-        await set_session_status("Grouping speakers…", ready=False)
+    return await submit_announcement(job, payload.queue)
 
-        try:
-            if target_kind == "speaker":
-                await join_targets_if_needed(leader, members)
 
-            await apply_volumes(targets, payload.volumes)
-            await set_session_status("Starting playback…", ready=False)
-            await play_stream_on_targets(targets)
-            ok, states = await wait_until_targets_ready(targets)
-
-            if ok:
-                await set_session_status("You can speak now", ready=True)
-                return {
-                    "ok": True,
-                    "leader": leader,
-                    "state": states.get(leader, "unknown"),
-                    "states": states,
-                    "message": "You can speak now",
-                    "stream_url": stream_url(),
-                    "volumes": active_session["volumes"],
-                }
-
-            await stop_targets(entity_ids)
-            await reset_session(stop_audio_engine=True)
-            return JSONResponse(
-                status_code=504,
-                content={
-                    "ok": False,
-                    "leader": leader,
-                    "state": states.get(leader, "unknown"),
-                    "states": states,
-                    "message": "Playback did not become ready in time",
-                    "stream_url": stream_url(),
-                },
-            )
-        except httpx.HTTPStatusError as exc:
-            detail = exc.response.text[:500]
-            await set_session_status(f"Home Assistant error: {detail}", ready=False)
-            await stop_targets(entity_ids)
-            await reset_session(stop_audio_engine=True)
-            raise HTTPException(status_code=502, detail=f"Home Assistant error: {detail}")
-        except Exception as exc:
-            await set_session_status(f"Start failed: {exc}", ready=False)
-            await stop_targets(entity_ids)
-            await reset_session(stop_audio_engine=True)
-            raise HTTPException(status_code=500, detail=str(exc))
+@app.get("/api/clips")
+async def api_clips():
+    return {"clips": await clip_library.list_clips()}
+
+
+@app.post("/api/clips/play")
+async def api_play_clip(payload: ClipPlayRequest):
+    targets = validate_target_ids(payload.target_ids)
+    clip = await load_clip(payload.clip)
+    job = AnnouncementJob("clip", targets, payload.client_id, payload.volumes, clip=clip)
+    return await submit_announcement(job, queue=False)
+
+
+@app.get("/api/announcements")
+async def api_announcements():
+    return scheduler.snapshot()
+
+
+@app.post("/api/announcements")
+async def api_add_announcement(payload: AnnouncementRequest):
+    if payload.kind not in ANNOUNCEMENT_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown announcement kind: {payload.kind}")
+    targets = validate_target_ids(payload.target_ids)
+
+    clip = chime = None
+    if payload.kind == "live":
+        if not payload.client_id:
+            raise HTTPException(status_code=400, detail="Live announcements need the recording client_id")
+        chime = await load_clip(payload.chime) if payload.chime else None
+    elif payload.kind == "clip":
+        if not payload.clip:
+            raise HTTPException(status_code=400, detail="Clip announcements need a clip")
+        clip = await load_clip(payload.clip)
+    else:
+        if not payload.message or not payload.tts_engine:
+            raise HTTPException(status_code=400, detail="TTS announcements need a message and a tts_engine")
+        clip = await load_tts_clip(payload.tts_engine, payload.message, payload.language)
+
+    job = AnnouncementJob(
+        payload.kind,
+        targets,
+        payload.client_id,
+        payload.volumes,
+        priority=payload.priority,
+        start_at=start_time(payload.start_at),
+        clip=clip,
+        chime=chime,
+    )
+    return await submit_announcement(job, queue=True)
+
+
+@app.get("/api/announcements/{job_id}")
+async def api_announcement(job_id: str):
+    job = scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown announcement")
+    return job.to_dict()
+
+
+@app.delete("/api/announcements/{job_id}")
+async def api_cancel_announcement(job_id: str):
+    async with session_lock:
+        job = scheduler.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown announcement")
+        if job.status == "queued":
+            scheduler.cancel(job)
+        elif job is scheduler.current:
+            job.status = "cancelled"
+            await end_session(drain=False)
+        return job.to_dict()
 
 
 @app.post("/api/stop")
@@ -699,10 +3078,8 @@ async def api_stop(payload: VolumeUpdateRequest | None = None):
     async with session_lock:
         if active_session["running"] and client_id is not None:
             validate_client_owns_session(client_id)
-        entity_ids = list(active_session["selected_entity_ids"])
         await set_session_status("Stopping…", ready=False)
-        await stop_targets(entity_ids)
-        await reset_session(stop_audio_engine=True)
+        await end_session()
     return {"ok": True}
 
 
@@ -722,73 +3099,224 @@ async def ws_audio(ws: WebSocket):
             await recorder_disconnect_task
         recorder_disconnect_task = None
 
+    preroll: Optional[PrerollBuffer] = None
+    owner = active_session.get("recorder_client_id")
+    if SPEAK_IMMEDIATELY and ws.query_params.get("preroll") == "1" and owner in (None, client_id):
+        preroll = preroll_buffers.setdefault(client_id, PrerollBuffer(client_id))
+
+    dsp: Optional[DspChain] = None
+    if DSP_ENABLED and np is not None:
+        dsp = dsp_chains[client_id] = DspChain()
+
     engine.active_ws_count += 1
     await engine.start()
 
     try:
         while True:
             data = await ws.receive_bytes()
-            if not active_session["running"] or active_session.get("recorder_client_id") != client_id:
+            owner = active_session.get("recorder_client_id")
+            if preroll is not None and not preroll.live:
+                if owner in (None, client_id) and preroll_buffers.get(client_id) is preroll:
+                    # Buffered raw; the DSP runs when the backlog is drained.
+                    preroll.append(data)
+                    continue
+                preroll = None
+            if not active_session["running"] or owner != client_id or active_session["draining"]:
                 continue
+            if dsp is not None:
+                data = dsp.process(data)
             await engine.write(data)
     except WebSocketDisconnect:
         pass
     except RuntimeError as exc:
-        print("Audio engine write failed:", exc)
+        log_event(logging.ERROR, "audio_write_failed", client_id=client_id, error=str(exc))
         with suppress(Exception):
             await ws.close(code=1011)
     except Exception as exc:
-        print("WebSocket audio error:", exc)
+        log_event(logging.ERROR, "websocket_audio_error", client_id=client_id, error=str(exc))
         with suppress(Exception):
             await ws.close(code=1011)
     finally:
         engine.active_ws_count = max(0, engine.active_ws_count - 1)
+        if dsp is not None and dsp_chains.get(client_id) is dsp:
+            dsp_chains.pop(client_id, None)
+        if preroll is not None and preroll.drain_task is None and preroll_buffers.get(client_id) is preroll:
+            preroll_buffers.pop(client_id, None)
 
         if active_session.get("recorder_client_id") == client_id and active_session["running"]:
-            print("Recorder websocket disconnected; session left running until manual stop")
+            log_event(logging.INFO, "recorder_disconnected", client_id=client_id)
 
 
-@app.get("/live.mp3")
-async def live_mp3(request: Request):
-    await engine.start()
-    queue = await engine.add_listener()
+def stream_title() -> str:
+    if not active_session["running"]:
+        return "PA System"
+    if active_session.get("kind") == "live":
+        return "Live announcement"
+    return str(active_session.get("status") or "Announcement")
+
+
+def icy_metadata(title: str) -> bytes:
+    text = "StreamTitle='{}';".format(title.replace("'", "")).encode("utf-8")[:255 * 16]
+    blocks = math.ceil(len(text) / 16)
+    return bytes([blocks]) + text.ljust(blocks * 16, b"\0")
+
 
-    async def streamer():
+class LiveStreamResponse(Response):
+    def __init__(self, headers: dict[str, str], queue: Optional[asyncio.Queue[bytes]] = None, metaint: int = 0) -> None:
+        self.status_code = 200
+        self.background = None
+        self.raw_headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()]
+        self.queue = queue
+        self.metaint = metaint
+        self.title: Optional[str] = None
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.queue is None:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        # A single parked receive notices the disconnect; writes never poll for it.
+        async def wait_for_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        tasks = [asyncio.create_task(self._write(send)), asyncio.create_task(wait_for_disconnect())]
         try:
-            while True:
-                if await request.is_disconnected():
-                    break
-                chunk = await queue.get()
-                yield chunk
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
         finally:
-            await engine.remove_listener(queue)
-
-    return StreamingResponse(
-        streamer(),
-        media_type="audio/mpeg",
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0",
-            "Connection": "keep-alive",
-        },
-    )
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await engine.remove_listener(self.queue)
+
+    async def _write(self, send) -> None:
+        queue = self.queue
+        until_metadata = self.metaint
+        while True:
+            chunk = await queue.get()
+            if STREAM_FLUSH_SECONDS and queue.empty():
+                await asyncio.sleep(STREAM_FLUSH_SECONDS)
+            buffer = bytearray(chunk)
+            while chunk and not queue.empty():
+                chunk = queue.get_nowait()
+                buffer += chunk
+            if buffer:
+                if self.metaint:
+                    buffer, until_metadata = self._insert_metadata(buffer, until_metadata)
+                await send({"type": "http.response.body", "body": bytes(buffer), "more_body": True})
+            if not chunk:
+                await send({"type": "http.response.body", "body": b""})
+                return
 
+    def _insert_metadata(self, data: bytearray, until_metadata: int) -> tuple[bytearray, int]:
+        output = bytearray()
+        while len(data) >= until_metadata:
+            output += data[:until_metadata]
+            del data[:until_metadata]
+            title = stream_title()
+            output += icy_metadata(title) if title != self.title else b"\0"
+            self.title = title
+            until_metadata = self.metaint
+        output += data
+        return output, until_metadata - len(data)
 
-@app.get("/health")
-async def health():
-    return {
-        "ok": True,
+
+@app.api_route("/live.mp3", methods=["GET", "HEAD"])
+async def live_mp3(request: Request):
+    # Live audio has no past to seek into: "bytes=0-" is fine, anything else is not.
+    range_header = request.headers.get("range", "").replace(" ", "").lower()
+    if range_header and not range_header.startswith("bytes=0-"):
+        raise HTTPException(status_code=416, detail="Live stream cannot be seeked", headers={"Content-Range": "bytes */*"})
+
+    metaint = ICY_METAINT if request.headers.get("icy-metadata") == "1" else 0
+    headers = {
+        "Content-Type": "audio/mpeg",
+        "Cache-Control": "no-cache, no-store, must-revalidate",
+        "Pragma": "no-cache",
+        "Expires": "0",
+        "Accept-Ranges": "none",
+        "icy-name": "PA System",
+    }
+    if metaint:
+        headers["icy-metaint"] = str(metaint)
+
+    # Only speakers sent the current stream URL get audio, and only while the
+    # encoder is already running; a stray probe never starts ffmpeg.
+    token = engine.stream_token
+    if not engine.is_running() or not token or not secrets.compare_digest(request.query_params.get("token", ""), token):
+        log_sampled("live_stream_rejected", 10.0, logging.DEBUG, "live_stream_rejected", client=request.client.host if request.client else None)
+        raise HTTPException(status_code=404, detail="No live stream")
+
+    if request.method == "HEAD":
+        return LiveStreamResponse(headers)
+
+    host = request.client.host if request.client else ""
+    if engine.listener_count(host) >= MAX_LISTENERS_PER_IP:
+        log_sampled(f"listener_limit:{host}", 10.0, logging.WARNING, "listener_limit_reached", client=host, limit=MAX_LISTENERS_PER_IP)
+        raise HTTPException(status_code=429, detail="Too many listeners from this address")
+    return LiveStreamResponse(headers, await engine.add_listener(host), metaint)
+
+
+def readiness_checks(shared: Optional[dict] = None) -> dict[str, bool]:
+    checks = {
+        "started": bool(getattr(app.state, "started", False)),
+        "lan_ip": network_identity["lan_ip"] is not None,
+        "event_loop": watchdog.stats()["lag_p95_ms"] < WATCHDOG_BLOCK_SECONDS * 1000,
+    }
+    if worker.owner:
+        checks["scheduler"] = bool(scheduler.task and not scheduler.task.done())
+    else:
+        checks["owner"] = shared is not None
+    return checks
+
+
+async def health_details() -> dict:
+    shared = None if worker.owner else await asyncio.to_thread(worker.read_state)
+    checks = readiness_checks(shared)
+    details = {
+        "ok": all(checks.values()),
+        "checks": checks,
+        "worker": {"pid": os.getpid(), "owner": worker.owner, "workers": WORKERS, "event_loop": type(asyncio.get_running_loop()).__module__},
         "ha_base_url": HA_BASE_URL,
         "app_base_url": APP_BASE_URL,
         "stream_url": stream_url(),
-        "lan_ip": get_lan_ip(),
+        "lan_ip": network_identity["lan_ip"],
+        "network": network_identity,
         "ffmpeg_running": engine.is_running(),
         "active_ws_count": engine.active_ws_count,
+        "silence_gate": engine.gate.stats() if engine.gate else None,
+        "watchdog": watchdog.stats(),
         "session": active_session,
         "targets_count": len(TARGETS),
         "log_level": LOG_LEVEL,
     }
+    if shared is not None:
+        details.update({
+            "ffmpeg_running": shared["ffmpeg_running"],
+            "active_ws_count": shared["active_ws_count"],
+            "silence_gate": shared["silence_gate"],
+            "session": {key: shared.get(key) for key in active_session},
+        })
+    return details
+
+
+@app.get("/health")
+async def health():
+    return await health_details()
+
+
+@app.get("/health/live")
+async def health_live():
+    return {"ok": True}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    details = await health_details()
+    if not details["ok"]:
+        return JSONResponse(status_code=503, content=details)
+    return details
 
 
 HTML_PAGE = r"""
@@ -952,6 +3480,26 @@ HTML_PAGE = r"""
       font-size: 0.92rem;
       line-height: 1.45;
     }
+    .clips {
+      display: grid;
+      grid-template-columns: minmax(0, 1fr) auto auto;
+      gap: 12px;
+      align-items: center;
+      margin-top: 12px;
+    }
+    .clips select {
+      min-height: 48px;
+      border-radius: 14px;
+      border: 1px solid var(--border);
+      background: rgba(255,255,255,0.03);
+      color: var(--text);
+      padding: 0 12px;
+      font-size: 1rem;
+    }
+    .clips label {
+      color: var(--muted);
+      white-space: nowrap;
+    }
     .sessionInfo {
       margin-top: 10px;
       color: var(--muted);
@@ -964,6 +3512,7 @@ HTML_PAGE = r"""
       }
       .wrap { padding: 10px; }
       .row { grid-template-columns: 1fr; }
+      .clips { grid-template-columns: 1fr; }
       .targetTop {
         flex-direction: column;
         align-items: stretch;
@@ -988,6 +3537,12 @@ HTML_PAGE = r"""
         <button id="stopBtn" class="danger" disabled>Stop</button>
       </div>
 
+      <div id="clipsRow" class="clips" hidden>
+        <select id="clipSelect"></select>
+        <label><input id="chimeToggle" type="checkbox" /> Play before Record</label>
+        <button id="playClipBtn" class="secondary" disabled>Play clip</button>
+      </div>
+
       <div class="status">
         <strong id="statusTitle">Idle</strong>
         <div id="statusBody">Nothing is playing.</div>
@@ -1050,6 +3605,7 @@ HTML_PAGE = r"""
     let mediaRecorder = null;
     let audioSocket = null;
     let appRunning = false;
+    let speakImmediately = false;
     let currentOwner = null;
     let selectedTargetIdsState = [];
     let targetMetaState = {};
@@ -1062,6 +3618,10 @@ HTML_PAGE = r"""
     const statusTitle = document.getElementById('statusTitle');
     const statusBody = document.getElementById('statusBody');
     const sessionInfo = document.getElementById('sessionInfo');
+    const clipsRow = document.getElementById('clipsRow');
+    const clipSelect = document.getElementById('clipSelect');
+    const chimeToggle = document.getElementById('chimeToggle');
+    const playClipBtn = document.getElementById('playClipBtn');
 
     function setStatus(title, body, extra = '') {
       statusTitle.textContent = title;
@@ -1159,6 +3719,7 @@ HTML_PAGE = r"""
       });
 
       recordBtn.disabled = appRunning || !hasSelection || anotherDeviceRunning;
+      playClipBtn.disabled = !hasSelection || !clipSelect.value;
       stopBtn.disabled = !appRunning;
     }
 
@@ -1287,6 +3848,7 @@ HTML_PAGE = r"""
       setTargetMeta(targets);
 
       currentOwner = statusData.recorder_client_id || null;
+      speakImmediately = Boolean(statusData.speak_immediately);
       appRunning = Boolean(statusData.running && currentOwner === clientId);
 
       for (const t of targets) {
@@ -1300,10 +3862,16 @@ HTML_PAGE = r"""
 
       if (statusData.running) {
         if (currentOwner === clientId) {
+          const failed = statusData.failed_entity_ids || [];
+          const waitingToPlay = speakImmediately && !statusData.ready;
           setStatus(
-            statusData.status || 'Running',
-            'Your device is currently recording.',
-            `Stream: ${statusData.stream_url || ''}`
+            waitingToPlay ? 'You can speak now' : (statusData.status || 'Running'),
+            waitingToPlay
+              ? `Your announcement will play as soon as the speakers are ready (${statusData.status || 'starting'}).`
+              : 'Your device is currently recording.',
+            failed.length
+              ? `Not playing: ${failed.join(', ')}. Stream: ${statusData.stream_url || ''}`
+              : `Stream: ${statusData.stream_url || ''}`
           );
         } else {
           setStatus(
@@ -1325,7 +3893,7 @@ HTML_PAGE = r"""
       updateButtons();
     }
 
-    async function openMicAndSocket() {
+    async function openMicAndSocket({ preroll = false } = {}) {
       mediaStream = await navigator.mediaDevices.getUserMedia({
         audio: {
           channelCount: 1,
@@ -1338,6 +3906,7 @@ HTML_PAGE = r"""
 
       const socketUrl = new URL(wsUrl('ws/audio'));
       socketUrl.searchParams.set('client_id', clientId);
+      if (preroll) socketUrl.searchParams.set('preroll', '1');
       audioSocket = new WebSocket(socketUrl.toString());
       audioSocket.binaryType = 'arraybuffer';
 
@@ -1410,34 +3979,73 @@ HTML_PAGE = r"""
       audioSocket = null;
     }
 
+    function readinessText(readiness) {
+      if (!readiness) return '';
+      const parts = [`${readiness.ready}/${readiness.total} ready`];
+      if (readiness.ready < readiness.required && typeof readiness.eta_seconds === 'number') {
+        parts.push(`expected in ~${Math.ceil(readiness.eta_seconds)}s`);
+      }
+      return parts.join(', ');
+    }
+
+    async function showStartProgress() {
+      try {
+        const res = await fetch(apiUrl('api/status'));
+        const data = await res.json();
+        if (data.running && data.recorder_client_id === clientId && !data.ready) {
+          setStatus(data.status || 'Starting speakers…', 'Waiting for playback to become ready.', readinessText(data.readiness));
+        }
+      } catch (err) {
+        console.error(err);
+      }
+    }
+
     async function startSession() {
       const targetIds = getSelectedTargetIds();
       if (!targetIds.length) return;
 
+      let progressTimer = null;
       try {
         appRunning = true;
         currentOwner = clientId;
         updateButtons();
 
-        setStatus('Starting speakers…', 'Grouping the selected targets and waiting for playback to become ready.');
+        if (speakImmediately) {
+          setStatus('Preparing microphone…', 'Opening your microphone.');
+          await openMicAndSocket({ preroll: true });
+          setStatus('You can speak now', 'Your announcement will play as soon as the speakers are ready.');
+        } else {
+          setStatus('Starting speakers…', 'Grouping the selected targets and waiting for playback to become ready.');
+          progressTimer = setInterval(showStartProgress, 1000);
+        }
         const res = await fetch(apiUrl('api/start'), {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({
             target_ids: targetIds,
             client_id: clientId,
-            volumes: currentVolumes()
+            volumes: currentVolumes(),
+            chime: chimeToggle.checked && clipSelect.value ? clipSelect.value : null
           })
         });
 
+        clearInterval(progressTimer);
+        progressTimer = null;
         const data = await res.json();
         if (!res.ok) {
           throw new Error(data.detail || data.message || 'Start failed');
         }
 
-        setStatus('Preparing microphone…', 'Speakers are ready. Opening your microphone now.', `Stream: ${data.stream_url}`);
-        await openMicAndSocket();
-        setStatus('You can speak now', 'The selected speakers are ready.', `Stream: ${data.stream_url}`);
+        if (!speakImmediately) {
+          setStatus('Preparing microphone…', 'Speakers are ready. Opening your microphone now.', `Stream: ${data.stream_url}`);
+          await openMicAndSocket();
+        }
+        const pending = data.pending_entity_ids || [];
+        setStatus(
+          'You can speak now',
+          pending.length ? `Still starting: ${pending.join(', ')}.` : 'The selected speakers are ready.',
+          `Stream: ${data.stream_url}`
+        );
       } catch (err) {
         console.error(err);
         setStatus('Start failed', String(err.message || err));
@@ -1445,6 +4053,78 @@ HTML_PAGE = r"""
         appRunning = false;
         currentOwner = null;
         updateButtons();
+      } finally {
+        if (progressTimer) clearInterval(progressTimer);
+      }
+    }
+
+    async function loadClips() {
+      const res = await fetch(apiUrl('api/clips'));
+      const data = await res.json();
+      const clips = data.clips || [];
+      const selected = clipSelect.value;
+
+      clipSelect.replaceChildren(...clips.map(c => new Option(c.name, c.name)));
+      if (clips.some(c => c.name === selected)) {
+        clipSelect.value = selected;
+      }
+      clipsRow.hidden = clips.length === 0;
+      updateButtons();
+    }
+
+    async function followClipJob(job) {
+      // A clip with nothing ahead of it is started as soon as it is queued,
+      // so follow it briefly before telling the user it is waiting.
+      const queuedUntil = Date.now() + 1000;
+      while (job.status === 'starting' || (job.status === 'queued' && Date.now() < queuedUntil)) {
+        if (job.status === 'starting') {
+          setStatus('Starting clip…', `${job.clip} (${job.duration}s) is starting.`);
+        }
+        await new Promise(resolve => setTimeout(resolve, 250));
+        const res = await fetch(apiUrl(`api/announcements/${job.id}`));
+        if (!res.ok) break;
+        job = await res.json();
+      }
+      return job;
+    }
+
+    async function playClip() {
+      const targetIds = getSelectedTargetIds();
+      if (!targetIds.length || !clipSelect.value) return;
+
+      try {
+        playClipBtn.disabled = true;
+        const res = await fetch(apiUrl('api/announcements'), {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({
+            kind: 'clip',
+            clip: clipSelect.value,
+            target_ids: targetIds,
+            client_id: clientId,
+            volumes: currentVolumes()
+          })
+        });
+        const data = await res.json();
+        if (!res.ok) {
+          throw new Error(data.detail || data.message || 'Clip playback failed');
+        }
+        const job = await followClipJob(data.job);
+        if (job.status === 'playing' || job.status === 'completed') {
+          setStatus('Playing', `${job.clip} (${job.duration}s) is playing.`);
+        } else if (job.status === 'failed') {
+          throw new Error(job.error || 'Clip playback failed');
+        } else {
+          setStatus(
+            'Clip queued',
+            `${job.clip} (${job.duration}s) is number ${data.position} in the queue.`
+          );
+        }
+      } catch (err) {
+        console.error(err);
+        setStatus('Clip failed', String(err.message || err));
+      } finally {
+        updateButtons();
       }
     }
 
@@ -1476,12 +4156,15 @@ HTML_PAGE = r"""
 
     recordBtn.addEventListener('click', startSession);
     stopBtn.addEventListener('click', stopSession);
+    playClipBtn.addEventListener('click', playClip);
+    clipSelect.addEventListener('change', updateButtons);
 
     setSelectedTargetIds([]);
     loadTargets().catch(err => {
       console.error(err);
       setStatus('Error', 'Could not load Home Assistant targets.');
     });
+    loadClips().catch(err => console.error(err));
 
     setInterval(() => {
       loadTargets({ silent: true }).catch(err => console.error(err));
@@ -1492,8 +4175,6 @@ HTML_PAGE = r"""
 """
 
 if __name__ == "__main__":
-    import uvicorn
-
     if sys.platform == "win32":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
@@ -1503,4 +4184,6 @@ if __name__ == "__main__":
         port=APP_PORT,
         reload=False,
         log_level=LOG_LEVEL,
+        loop=EVENT_LOOP,
+        workers=WORKERS,
     )
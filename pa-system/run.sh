@@ -6,6 +6,21 @@ OPTIONS="/data/options.json"
 home_assistant_ip="$(jq -r '.home_assistant_ip' "$OPTIONS")"
 ha_token="$(jq -r '.ha_token' "$OPTIONS")"
 log_level="$(jq -r '.log_level' "$OPTIONS")"
+readiness_timeout="$(jq -r '.readiness_timeout // 15' "$OPTIONS")"
+readiness_quorum="$(jq -r '.readiness_quorum // 1.0' "$OPTIONS")"
+partial_ready_targets="$(jq -r '.partial_ready_targets // 0' "$OPTIONS")"
+speak_immediately="$(jq -r '.speak_immediately // false' "$OPTIONS")"
+silence_gate="$(jq -r '.silence_gate // false' "$OPTIONS")"
+silence_gate_threshold_db="$(jq -r '.silence_gate_threshold_db // -50' "$OPTIONS")"
+dsp="$(jq -r '.dsp // false' "$OPTIONS")"
+dsp_target_level_db="$(jq -r '.dsp_target_level_db // -20' "$OPTIONS")"
+clips_dir="$(jq -r '.clips_dir // "/media/pa_system"' "$OPTIONS")"
+group_hold_seconds="$(jq -r '.group_hold_seconds // 15' "$OPTIONS")"
+restore_state="$(jq -r 'if .restore_state == false then "false" else "true" end' "$OPTIONS")"
+event_loop="$(jq -r '.event_loop // "uvloop"' "$OPTIONS")"
+workers="$(jq -r '.workers // 1' "$OPTIONS")"
+stream_flush_ms="$(jq -r '.stream_flush_ms // 20' "$OPTIONS")"
+max_listeners_per_ip="$(jq -r '.max_listeners_per_ip // 4' "$OPTIONS")"
 targets_json="$(jq -r '.targets_json' "$OPTIONS")"
 
 if [[ -z "$home_assistant_ip" || "$home_assistant_ip" == "null" ]]; then
@@ -23,6 +38,21 @@ export APP_HOST="0.0.0.0"
 export APP_BASE_URL="http://${home_assistant_ip}:8099"
 export HA_TOKEN="$ha_token"
 export LOG_LEVEL="$log_level"
+export READINESS_TIMEOUT="$readiness_timeout"
+export READINESS_QUORUM="$readiness_quorum"
+export PARTIAL_READY_TARGETS="$partial_ready_targets"
+export SPEAK_IMMEDIATELY="$speak_immediately"
+export SILENCE_GATE="$silence_gate"
+export SILENCE_GATE_THRESHOLD_DB="$silence_gate_threshold_db"
+export DSP_ENABLED="$dsp"
+export DSP_TARGET_LEVEL_DB="$dsp_target_level_db"
+export CLIPS_DIR="$clips_dir"
+export GROUP_HOLD_SECONDS="$group_hold_seconds"
+export RESTORE_STATE="$restore_state"
+export EVENT_LOOP="$event_loop"
+export WORKERS="$workers"
+export STREAM_FLUSH_MS="$stream_flush_ms"
+export MAX_LISTENERS_PER_IP="$max_listeners_per_ip"
 export TARGETS_JSON="$targets_json"
 export HOME_ASSISTANT_IP="$home_assistant_ip"
 
@@ -64,4 +94,6 @@ exec uvicorn pa_system_app:app \
   --port 8099 \
   --proxy-headers \
   --forwarded-allow-ips='*' \
+  --loop "$event_loop" \
+  --workers "$workers" \
   --log-level "$log_level"